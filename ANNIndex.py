@@ -0,0 +1,225 @@
+import os
+import time
+import argparse
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobEmbeddingIndex import JobEmbeddingIndex, INDEX_DIR
+from JobClusterIndex import JobClusterIndex
+from CompactVectors import CompactVectors
+
+SEARCH_KINDS = ("exact", "ivf", "hnsw")
+# Search indexes kept per process; older ones (e.g. of a replaced job index) are dropped
+MAX_SEARCH_INDEXES = 4
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype = np.float32)
+    norms = np.linalg.norm(vectors, axis = 1, keepdims = True)
+    return np.divide(vectors, norms, out = np.zeros_like(vectors), where = norms > 0)
+
+
+def top_k_rows(scores, k):
+    """
+    Column indices of the k highest scores in each row, best first.
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.zeros((len(scores), 0), dtype = int)
+    top = np.argpartition(-scores, k - 1, axis = 1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis = 1), axis = 1, kind = "stable")
+    return np.take_along_axis(top, order, axis = 1)
+
+
+def compact(vectors):
+    return vectors if isinstance(vectors, CompactVectors) else CompactVectors(np.asarray(vectors, dtype = np.float32))
+
+
+class ExactSearch:
+    """
+    Brute-force cosine search over all job vectors; the reference for recall.
+    Scores the vectors in their stored form (see CompactVectors), without a copy.
+    """
+    name = "exact"
+
+    def __init__(self, vectors):
+        self.vectors = compact(vectors)
+
+    def search(self, queries, k = 10):
+        """
+        Returns (indices, similarities), each of shape (n queries, k), best first.
+        """
+        scores = self.vectors.cosine(queries)
+        top = top_k_rows(scores, k)
+        return top, np.take_along_axis(scores, top, axis = 1)
+
+
+class IVFSearch:
+    """
+    Inverted-file search on the KMeans fit from JobClusterIndex: each query is only
+    compared with the jobs in its nprobe nearest clusters, read from the stored
+    vectors through the fit's cluster order.
+    """
+    name = "ivf"
+
+    def __init__(self, vectors, job_clusters, nprobe = 4):
+        self.job_clusters = job_clusters
+        self.nprobe = nprobe
+        self.order = job_clusters.order
+        self.bounds = job_clusters.bounds
+        self.vectors = compact(vectors)
+
+    def probe(self, query):
+        """
+        The nprobe clusters whose centroids are nearest to the query.
+        """
+        centroids = self.job_clusters.centroids
+        distances = ((centroids - query) ** 2).sum(axis = 1)
+        nprobe = min(self.nprobe, len(centroids))
+        return np.argpartition(distances, nprobe - 1)[:nprobe]
+
+    def search(self, queries, k = 10):
+        queries = np.atleast_2d(np.asarray(queries, dtype = np.float32))
+        indices = np.full((len(queries), k), -1, dtype = int)
+        similarities = np.full((len(queries), k), -np.inf, dtype = np.float32)
+
+        for i, query in enumerate(queries):
+            # Only the jobs of the probed lists are read and scored
+            rows = np.sort(np.concatenate([self.order[self.bounds[cluster]:self.bounds[cluster + 1]] for cluster in self.probe(query)]))
+            scores = self.vectors.cosine(query, rows)[0]
+            top = top_k_rows(scores[None, :], k)[0]
+            indices[i, :len(top)] = rows[top]
+            similarities[i, :len(top)] = scores[top]
+        return indices, similarities
+
+
+class HNSWSearch:
+    """
+    Graph-based search using hnswlib (optional dependency: pip install hnswlib).
+    """
+    name = "hnsw"
+
+    def __init__(self, vectors, ef_construction = 200, M = 16, ef = 64):
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("HNSWSearch requires hnswlib (pip install hnswlib)") from e
+        vectors = normalize_rows(vectors)
+        self.index = hnswlib.Index(space = "ip", dim = vectors.shape[1])
+        self.index.init_index(max_elements = len(vectors), ef_construction = ef_construction, M = M)
+        self.index.add_items(vectors, np.arange(len(vectors)))
+        self.index.set_ef(ef)
+
+    def search(self, queries, k = 10):
+        labels, distances = self.index.knn_query(normalize_rows(np.atleast_2d(queries)), k = k)
+        return labels.astype(int), 1 - distances
+
+
+def build_search_index(job_index, kind = "exact", n_lists = None, nprobe = 4, **kwargs):
+    """
+    Builds a search index over the job profile embeddings behind the common
+    search(queries, k) -> (indices, similarities) interface.
+    """
+    if kind == "exact":
+        return ExactSearch(job_index.profile)
+    if kind == "ivf":
+        # sqrt(n) lists is the usual IVF default
+        n_lists = n_lists or max(1, int(np.sqrt(len(job_index))))
+        return IVFSearch(job_index.profile, JobClusterIndex.load_or_build(job_index, n_lists), nprobe)
+    if kind == "hnsw":
+        return HNSWSearch(job_index.profile, **kwargs)
+    raise ValueError(f"Unknown search index: {kind}")
+
+
+def search_settings(kind = None, n_lists = None, nprobe = None):
+    """
+    The search index settings to use: the arguments if given, else SEARCH_INDEX
+    (exact, ivf or hnsw; default exact), SEARCH_N_LISTS (default sqrt of the job
+    count) and SEARCH_NPROBE (default 4).
+    """
+    kind = kind or os.getenv("SEARCH_INDEX", "exact")
+    if kind not in SEARCH_KINDS:
+        raise ValueError(f"Unknown search index: {kind} (choose from {', '.join(SEARCH_KINDS)})")
+    n_lists = n_lists or (int(os.getenv("SEARCH_N_LISTS")) if os.getenv("SEARCH_N_LISTS") else None)
+    nprobe = nprobe or int(os.getenv("SEARCH_NPROBE", "4"))
+    return kind, n_lists, nprobe
+
+
+_search_indexes = OrderedDict()
+_search_indexes_lock = threading.Lock()
+
+
+def get_search_index(job_index, kind = None, n_lists = None, nprobe = None):
+    """
+    Search index for job_index (settings from search_settings), built once per
+    process and reused across requests. The MAX_SEARCH_INDEXES most recently used
+    indexes are kept.
+    """
+    kind, n_lists, nprobe = search_settings(kind, n_lists, nprobe)
+    if job_index.path is None:
+        # An in-memory subset (JobEmbeddingIndex.take) is not cached
+        return build_search_index(job_index, kind, n_lists, nprobe)
+    key = (job_index.path, kind, n_lists, nprobe)
+    with _search_indexes_lock:
+        search_index = _search_indexes.get(key)
+        if search_index is None:
+            search_index = _search_indexes[key] = build_search_index(job_index, kind, n_lists, nprobe)
+        _search_indexes.move_to_end(key)
+        while len(_search_indexes) > MAX_SEARCH_INDEXES:
+            _search_indexes.popitem(last = False)
+    return search_index
+
+
+def recall_at_k(approx_indices, exact_indices):
+    """
+    Mean fraction of the exact top k found by the approximate search.
+    """
+    hits = [len(set(approx) & set(exact)) / len(exact) for approx, exact in zip(approx_indices, exact_indices) if len(exact)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def evaluate(search_index, exact_index, queries, k = 10):
+    """
+    Reports recall@k against exact search and mean per-query latency.
+    """
+    start = time.perf_counter()
+    exact_indices, _ = exact_index.search(queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    approx_indices, _ = search_index.search(queries, k)
+    approx_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    return {
+        "index": search_index.name,
+        "k": k,
+        f"recall@{k}": round(recall_at_k(approx_indices, exact_indices), 4),
+        "ms_per_query": round(approx_ms, 3),
+        "exact_ms_per_query": round(exact_ms, 3),
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Report recall@k and latency of approximate job search.")
+    arg_parser.add_argument("--csv", default = "job_data.csv")
+    arg_parser.add_argument("--index-dir", default = INDEX_DIR)
+    arg_parser.add_argument("--kind", choices = ["ivf", "hnsw"], default = "ivf")
+    arg_parser.add_argument("--n-lists", type = int, default = None)
+    arg_parser.add_argument("--nprobe", type = int, default = 4)
+    arg_parser.add_argument("--k", type = int, default = 10)
+    arg_parser.add_argument("--queries", type = int, default = 200)
+    args = arg_parser.parse_args()
+
+    job_df = pd.read_csv(args.csv)
+    job_index = JobEmbeddingIndex.load_or_build(job_df, ModelRegistry.get_sentence_model(MODEL_NAME), MODEL_NAME, args.index_dir)
+
+    # Queries: job vectors with noise, standing in for student profiles near real jobs
+    rng = np.random.default_rng(42)
+    sample = rng.choice(len(job_index), size = min(args.queries, len(job_index)), replace = False)
+    base = np.asarray(job_index.profile, dtype = np.float32)[sample]
+    queries = base + rng.normal(scale = base.std(), size = base.shape).astype(np.float32)
+
+    search_index = build_search_index(job_index, args.kind, args.n_lists, args.nprobe)
+    print(evaluate(search_index, ExactSearch(job_index.profile), queries, args.k))
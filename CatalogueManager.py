@@ -0,0 +1,229 @@
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobEmbeddingIndex import JobEmbeddingIndex, INDEX_DIR, INDEX_VERSION
+from JobClusterIndex import JobClusterIndex
+from CompactVectors import PRECISIONS, embedding_precision
+
+# Share of jobs added/changed/removed since the last KMeans fit that triggers a refit
+REFIT_THRESHOLD = 0.2
+# Name of the file in the index directory holding the key of the current index
+CURRENT_FILE = "CURRENT"
+
+
+class CatalogueManager:
+    """
+    Updates the job embedding index and cluster fits for a new job catalogue
+    without a full rebuild. The new catalogue is diffed against the current index
+    by Job ID and row content hash: unchanged jobs keep their stored vectors, only
+    added and changed jobs are encoded, and removed jobs are dropped (their IDs are
+    listed in the update report and meta.json). No tombstones are kept: stored
+    recommendations hold job titles, not index rows, so they stay readable after
+    a job leaves the index. New jobs are assigned to the existing KMeans centroids until
+    the churn since the last fit exceeds refit_threshold.
+    """
+
+    def __init__(self, model = None, model_name = MODEL_NAME, index_dir = INDEX_DIR, skill_cache = None, refit_threshold = REFIT_THRESHOLD, precision = None):
+        self.model = model or ModelRegistry.get_sentence_model(model_name)
+        self.model_name = model_name
+        self.precision = embedding_precision(precision)
+        self.index_dir = index_dir
+        self.skill_cache = skill_cache
+        self.refit_threshold = refit_threshold
+
+    def current(self):
+        """
+        The current index: the one named in CURRENT, else the newest index built
+        for this model, precision and index version. None if there is none.
+        """
+        pointer = os.path.join(self.index_dir, CURRENT_FILE)
+        if os.path.exists(pointer):
+            with open(pointer) as f:
+                path = os.path.join(self.index_dir, f.read().strip())
+            if os.path.exists(os.path.join(path, "meta.json")):
+                return JobEmbeddingIndex.load(path)
+
+        candidates = []
+        for key in os.listdir(self.index_dir) if os.path.isdir(self.index_dir) else []:
+            meta_path = os.path.join(self.index_dir, key, "meta.json")
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if (meta.get("model_name"), meta.get("precision"), meta.get("version")) == (self.model_name, self.precision, INDEX_VERSION):
+                candidates.append((os.path.getmtime(meta_path), key))
+        return JobEmbeddingIndex.load(os.path.join(self.index_dir, max(candidates)[1])) if candidates else None
+
+    def set_current(self, job_index):
+        with open(os.path.join(self.index_dir, CURRENT_FILE), "w") as f:
+            f.write(job_index.meta["key"])
+
+    @staticmethod
+    def diff(job_index, job_data):
+        """
+        Compares the catalogue with the index. Returns the row positions in job_data
+        of unchanged jobs with their positions in the index, the positions in
+        job_data of added and changed jobs, and the Job IDs of removed jobs.
+        """
+        old_rows = {job_id: row for row, job_id in enumerate(job_index.job_ids.tolist())}
+        new_hashes = JobEmbeddingIndex.hash_rows(job_data)
+
+        kept, kept_old, added, changed = [], [], [], []
+        for row, job_id in enumerate(job_data["Job ID"].tolist()):
+            old_row = old_rows.get(job_id)
+            if old_row is None:
+                added.append(row)
+            elif job_index.row_hashes[old_row] != new_hashes[row]:
+                changed.append(row)
+            else:
+                kept.append(row)
+                kept_old.append(old_row)
+        removed = sorted(old_rows.keys() - set(job_data["Job ID"].tolist()))
+        return {"kept": kept, "kept_old": kept_old, "added": added, "changed": changed, "removed": removed}
+
+    def update(self, job_data):
+        """
+        Brings the index (and every cluster fit stored with it) up to date with
+        job_data and makes it the current index. Returns (job_index, report).
+        """
+        if job_data["Job ID"].duplicated().any():
+            raise ValueError("Job IDs in the catalogue must be unique.")
+
+        old_index = self.current()
+        key = JobEmbeddingIndex.index_key(job_data, self.model_name, self.precision)
+        if old_index is None or old_index.meta["key"] == key:
+            # Nothing to diff against, or nothing changed
+            job_index = JobEmbeddingIndex.load_or_build(job_data, self.model, self.model_name, self.index_dir, self.skill_cache, self.precision)
+            self.set_current(job_index)
+            return job_index, {"added": 0, "changed": 0, "removed": 0, "encoded": 0 if old_index else len(job_data), "clusters": {}}
+
+        changes = self.diff(old_index, job_data)
+        encoded_rows = sorted(changes["added"] + changes["changed"])
+        report = {
+            "parent": old_index.meta["key"],
+            "added": len(changes["added"]),
+            "changed": len(changes["changed"]),
+            "removed": len(changes["removed"]),
+            "encoded": len(encoded_rows),
+            "removed_ids": [str(job_id) for job_id in changes["removed"]],
+        }
+
+        # Unchanged rows are copied from the old index, the rest is encoded with
+        # the old skill vocabulary extended by any new skills
+        kept = old_index.take(changes["kept_old"])
+        arrays, vocabulary, new_skill_vectors = JobEmbeddingIndex.encode_rows(
+            job_data.iloc[encoded_rows], self.model, self.skill_cache, old_index.skill_vocab
+        )
+        merged = self.merge_rows(kept, arrays, changes["kept"], encoded_rows)
+        merged["skill_vectors"] = np.concatenate([np.asarray(old_index.skill_vectors), new_skill_vectors])
+        job_index = JobEmbeddingIndex.save(
+            job_data, self.model_name, self.index_dir, merged, vocabulary, self.precision,
+            parent = report["parent"], update = {name: value for name, value in report.items() if name != "parent"}
+        )
+
+        report["clusters"] = {}
+        for name in sorted(os.listdir(old_index.path)):
+            if name.startswith("clusters_") and os.path.exists(os.path.join(old_index.path, name, "clusters.json")):
+                old_clusters = JobClusterIndex.load(os.path.join(old_index.path, name))
+                report["clusters"][name] = self.update_clusters(old_clusters, job_index, name, changes, encoded_rows)
+
+        self.set_current(job_index)
+        return job_index, report
+
+    @staticmethod
+    def merge_rows(kept, encoded, kept_rows, encoded_rows):
+        """
+        Interleaves the copied rows (an index) and the encoded rows (arrays from
+        encode_rows) back into catalogue order.
+        """
+        arrays = {}
+        for name in JobEmbeddingIndex.ARRAYS:
+            arrays[name] = np.concatenate([np.asarray(getattr(kept, name)), encoded[name]]).astype(np.float32)
+        for kind in ("hard", "soft"):
+            kept_offsets = getattr(kept, f"{kind}_skill_offsets")
+            arrays[f"{kind}_skill_ids"] = np.concatenate([getattr(kept, f"{kind}_skill_ids"), encoded[f"{kind}_skill_ids"]]).astype(np.int32)
+            arrays[f"{kind}_skill_offsets"] = np.concatenate(
+                [kept_offsets, kept_offsets[-1] + encoded[f"{kind}_skill_offsets"][1:]]
+            ).astype(np.int64)
+
+        # Position of every catalogue row in the stacked arrays
+        n_rows = len(kept_rows) + len(encoded_rows)
+        positions = np.empty(n_rows, dtype = int)
+        positions[kept_rows] = np.arange(len(kept_rows))
+        positions[encoded_rows] = len(kept_rows) + np.arange(len(encoded_rows))
+
+        stacked = dict(
+            arrays, job_ids = np.arange(n_rows), row_hashes = np.arange(n_rows),
+            skill_vocab = kept.skill_vocab, skill_vectors = kept.skill_vectors
+        )
+        ordered = JobEmbeddingIndex(None, {}, stacked).take(positions)
+        return {name: getattr(ordered, name) for name in JobEmbeddingIndex.ARRAYS + JobEmbeddingIndex.SKILL_ARRAYS[1:]}
+
+    def update_clusters(self, old_clusters, job_index, name, changes, encoded_rows):
+        """
+        Carries a cluster fit over to the new index: unchanged jobs keep their label
+        and added/changed jobs go to the nearest existing centroid. Refits KMeans
+        when the churn since the last fit exceeds the threshold or a cluster empties.
+        """
+        churn = old_clusters.meta.get("churn", 0) + len(encoded_rows) + len(changes["removed"])
+        n_fitted = old_clusters.meta.get("n_fitted", len(old_clusters.labels))
+        n_clusters = None if name == "clusters_auto" else old_clusters.n_clusters
+
+        labels = np.empty(len(job_index), dtype = np.int32)
+        labels[changes["kept"]] = old_clusters.labels[changes["kept_old"]]
+        if encoded_rows:
+            labels[encoded_rows] = old_clusters.nearest_clusters(np.asarray(job_index.profile[encoded_rows]))
+
+        empty = len(np.unique(labels)) < old_clusters.n_clusters
+        if churn / max(n_fitted, 1) > self.refit_threshold or empty:
+            clusters = JobClusterIndex.build(job_index, n_clusters)
+            return {"refit": True, "n_clusters": clusters.n_clusters, "churn": churn}
+
+        meta = dict(old_clusters.meta, index_key = job_index.meta["key"], churn = churn)
+        JobClusterIndex.save(os.path.join(job_index.path, name), old_clusters.centroids, labels, meta)
+        return {"refit": False, "n_clusters": old_clusters.n_clusters, "churn": churn}
+
+    def prune(self, keep = 2):
+        """
+        Deletes all but the current index and the keep - 1 most recent others.
+        """
+        current = self.current()
+        indexes = []
+        for key in os.listdir(self.index_dir):
+            meta_path = os.path.join(self.index_dir, key, "meta.json")
+            if os.path.exists(meta_path) and (current is None or key != current.meta["key"]):
+                indexes.append((os.path.getmtime(meta_path), key))
+        removed = [key for _, key in sorted(indexes, reverse = True)[max(keep - 1, 0):]]
+        for key in removed:
+            shutil.rmtree(os.path.join(self.index_dir, key))
+        return removed
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Update the job index for a new job catalogue without a full rebuild.")
+    arg_parser.add_argument("--csv", default = "job_data.csv")
+    arg_parser.add_argument("--model", default = MODEL_NAME)
+    arg_parser.add_argument("--index-dir", default = INDEX_DIR)
+    arg_parser.add_argument("--refit-threshold", type = float, default = REFIT_THRESHOLD, help = "Churn since the last KMeans fit (share of jobs) that triggers a refit")
+    arg_parser.add_argument("--precision", choices = PRECISIONS, default = None, help = "Embedding storage precision (default: EMBEDDING_PRECISION or float32)")
+    arg_parser.add_argument("--keep", type = int, default = None, help = "Keep only this many index versions on disk")
+    args = arg_parser.parse_args()
+
+    manager = CatalogueManager(
+        model_name = args.model, index_dir = args.index_dir,
+        skill_cache = ModelRegistry.get_skill_cache(args.model), refit_threshold = args.refit_threshold,
+        precision = args.precision
+    )
+    job_index, report = manager.update(pd.read_csv(args.csv))
+    print(f"✅ Job index {job_index.meta['key']} is current ({len(job_index)} jobs)")
+    print(f"Added: {report['added']}, changed: {report['changed']}, removed: {report['removed']}, encoded: {report['encoded']}")
+    for name, result in report["clusters"].items():
+        status = "refit" if result["refit"] else "assigned to existing centroids"
+        print(f"{name}: k={result['n_clusters']}, churn={result['churn']} ({status})")
+    if args.keep:
+        for key in manager.prune(args.keep):
+            print(f"Removed old index {key}")
@@ -1,82 +1,65 @@
-import ast
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobCatalogue import parse_skills
+from JobEmbeddingIndex import JobEmbeddingIndex, student_profile_text, student_chunks
+from JobClusterIndex import JobClusterIndex
+from Metrics import get_metrics
 
 class ClusterProcessor:
-    def __init__(self, student_profile, job_data, n_clusters: int = 5):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    def __init__(self, student_profile, job_data, n_clusters: int = None, job_index = None, job_clusters = None):
+        self.model = ModelRegistry.get_sentence_model(MODEL_NAME)
         self.student = student_profile
-        self.job_data = job_data.copy()
-        self.kmeans = KMeans(n_clusters = n_clusters, random_state = 42)
+        self.job_data = job_data
 
-        # Preprocess skills
-        self.job_data["Hard Skills"] = self.job_data["Hard Skills"].apply(ast.literal_eval)
-        self.job_data["Soft Skills"] = self.job_data["Soft Skills"].apply(ast.literal_eval)
-        self.job_data['Hard Skills'] = self.job_data['Hard Skills'].apply(self.preprocess_skills)
-        self.job_data['Soft Skills'] = self.job_data['Soft Skills'].apply(self.preprocess_skills)
-    
-    def preprocess_skills(self, skills):
-        return [skill.strip().lower() for skill in skills]
-    
-    def embed_job(self, job_row):
-        """
-        Embeds a job posting into a vector using SentenceTransformer.
-        """
-        text = (
-            f"Job Title: {job_row['Job Title']}. "
-            f"Industry: {job_row['Industry']}. "
-            f"Hard Skills required: {', '.join(job_row['Hard Skills'])}. "
-            f"Soft Skills required: {', '.join(job_row['Soft Skills'])}. "
-            f"Required degree field: {job_row['Required Degree Field']}. "
-            f"Required education level: {job_row['Required Education']}. "
-            f"Years of experience required: {job_row['Years of Experience']}."
-        )
-        return self.model.encode(text, convert_to_numpy = True)
+        # Load precomputed job embeddings (built on first use for this catalogue)
+        self.job_index = JobEmbeddingIndex.for_catalogue(self.job_data, self.model, job_index)
+
+        # Load the persisted KMeans fit (k from the stored sweep unless n_clusters is given)
+        if job_clusters is None:
+            job_clusters = JobClusterIndex.load_or_build(self.job_index, n_clusters)
+        self.job_clusters = job_clusters
 
+        # A compiled catalogue (JobCatalogue) already holds parsed skill lists; a
+        # CSV frame is parsed into a new frame so the caller's is left untouched
+        if len(job_data) and isinstance(job_data["Hard Skills"].iloc[0], str):
+            self.job_data = job_data.assign(**{
+                "Hard Skills": job_data["Hard Skills"].apply(parse_skills),
+                "Soft Skills": job_data["Soft Skills"].apply(parse_skills),
+            })
     
     def embed_student(self):
         """
         Embeds the student profile into a vector using SentenceTransformer.
         """
-        text = (
-            f"Student profile. "
-            f"Hard Skills: {', '.join(self.student['Hard Skills'])}. "
-            f"Soft Skills: {', '.join(self.student['Soft Skills'])}. "
-            f"Degree field: {self.student['Degree Field']}. "
-            f"Education level: {self.student['Education Level']}. "
-            f"Work experience: {self.student['Work Experience']} years."
-        )
+        text = student_profile_text(self.student)
         return self.model.encode(text, convert_to_numpy = True)
     
     def compute_job_score(self):
         """
-        Embeds all jobs, clusters them, and returns the jobs in the same cluster
-        as the student with a similarity score.
+        Looks up the student's nearest job cluster and returns the jobs in that
+        cluster with a similarity score.
         """
-        # Embed jobs
-        self.job_data['vectors'] = self.job_data.apply(lambda row: self.embed_job(row), axis = 1)
-        job_vectors = np.stack(self.job_data['vectors'].values).astype(np.float64)
+        # Job embeddings stay in the shared, memory-mapped index, in their stored
+        # precision; only the student's cluster is read below
+        job_vectors = self.job_index.profile
 
         # Embed student
-        self.student_vector = self.embed_student().astype(np.float64)
-        
-        # Fit KMeans
-        self.job_data['cluster'] = self.kmeans.fit_predict(job_vectors)
+        self.student_vector = self.embed_student().astype(np.float32)
 
-        # Predict student's cluster
-        student_cluster = self.kmeans.predict([self.student_vector])[0]
+        with get_metrics().span("score_clustering", n_students = 1, n_jobs = len(self.job_data)):
+            # Predict student's cluster
+            student_cluster = self.job_clusters.nearest_cluster(self.student_vector)
 
-        # Filter jobs in the same cluster
-        cluster_jobs = self.job_data[self.job_data['cluster'] == student_cluster].copy()
+            # Filter jobs in the same cluster
+            members = self.job_clusters.members(student_cluster)
+            cluster_jobs = self.job_data.iloc[members].copy()
+            cluster_jobs['cluster'] = self.job_clusters.labels[members]
+
+            # Compute cosine similarities
+            similarities = job_vectors.cosine(self.student_vector, members)[0]
+            cluster_jobs['similarity'] = similarities
 
-         # Compute cosine similarities
-        cluster_matrix = np.stack(cluster_jobs['vectors'].values)
-        similarities = cosine_similarity([self.student_vector], cluster_matrix)[0]
-        cluster_jobs['similarity'] = similarities
-        
         self.cluster_jobs = cluster_jobs
         return cluster_jobs
             
@@ -96,7 +79,39 @@ class ClusterProcessor:
         
         return top_k_jobs
     
-    def generate_recommendation_row(self, student_name, top_jobs):
+    @classmethod
+    def recommend_batch(cls, students, job_data, k = 5, n_clusters: int = None, job_index = None, job_clusters = None, chunk_size = None):
+        """
+        Recommends the top k jobs for every student in a DataFrame of profiles with
+        one batched encode call and students x jobs similarity matrices, computed
+        chunk_size students at a time. Returns one table per student, in order.
+        """
+        model = ModelRegistry.get_sentence_model(MODEL_NAME)
+        job_index = JobEmbeddingIndex.for_catalogue(job_data, model, job_index)
+        if job_clusters is None:
+            job_clusters = JobClusterIndex.load_or_build(job_index, n_clusters)
+
+        students = students.reset_index(drop = True)
+        texts = [student_profile_text(student) for _, student in students.iterrows()]
+        student_vectors = model.encode(texts, convert_to_numpy = True).astype(np.float32)
+        student_clusters = job_clusters.nearest_clusters(student_vectors)
+        job_vectors = job_index.profile
+
+        recommendations = []
+        for chunk in student_chunks(len(students), len(job_data), chunk_size):
+            with get_metrics().span("score_clustering", n_students = len(students[chunk]), n_jobs = len(job_data)):
+                similarities = job_vectors.cosine(student_vectors[chunk])
+            for row, cluster in zip(similarities, student_clusters[chunk]):
+                members = job_clusters.members(cluster)
+                order = np.argsort(-row[members], kind = "stable")[:k]
+                top_k_jobs = job_data.iloc[members[order]].copy()
+                top_k_jobs['cluster'] = cluster
+                top_k_jobs['similarity'] = row[members[order]]
+                recommendations.append(top_k_jobs)
+        return recommendations
+
+    @staticmethod
+    def generate_recommendation_row(student_name, top_jobs):
         titles = top_jobs['Job Title'].tolist()
         return {
             "name": student_name,
@@ -0,0 +1,123 @@
+import os
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+# Rows widened to float32 at a time when scoring a compact matrix (~12 MB at dim 384)
+BLOCK_ROWS = 8192
+
+
+def embedding_precision(precision = None):
+    """
+    The storage precision to use: precision if given, else EMBEDDING_PRECISION
+    (default float32).
+    """
+    precision = precision or os.getenv("EMBEDDING_PRECISION", "float32")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown embedding precision: {precision} (choose from {', '.join(PRECISIONS)})")
+    return precision
+
+
+class CompactVectors:
+    """
+    A matrix of row vectors stored as float32, float16, or int8 with one float32
+    scale per row (row = data * scale). Each row's norm is stored too, so cosine
+    similarities are computed straight from the compact rows, a block of rows at a
+    time, without ever widening the whole matrix.
+
+    Indexing (vectors[rows]) and np.asarray(vectors) return float32 rows.
+    """
+
+    def __init__(self, data, scale = None, norms = None):
+        self.data = data
+        self.scale = scale
+        self.precision = str(data.dtype)
+        if norms is None:
+            norms = np.concatenate([np.linalg.norm(block, axis = 1) for block in self.blocks()] or [np.zeros(0)])
+        self.norms = np.asarray(norms, dtype = np.float32)
+
+    @classmethod
+    def encode(cls, vectors, precision = "float32"):
+        """
+        Stores float vectors at the given precision. int8 scales each row by its
+        largest absolute value, so every row uses the full [-127, 127] range.
+        """
+        vectors = np.asarray(vectors, dtype = np.float32)
+        if precision == "int8":
+            scale = np.abs(vectors).max(axis = 1, initial = 0) / 127
+            scale[scale == 0] = 1
+            data = np.rint(vectors / scale[:, None]).astype(np.int8)
+            return cls(data, scale.astype(np.float32))
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown embedding precision: {precision}")
+        return cls(vectors.astype(precision))
+
+    def save(self, path, name):
+        np.save(os.path.join(path, f"{name}.npy"), self.data)
+        np.save(os.path.join(path, f"{name}_norms.npy"), self.norms)
+        if self.scale is not None:
+            np.save(os.path.join(path, f"{name}_scale.npy"), self.scale)
+
+    @classmethod
+    def load(cls, path, name):
+        """
+        Memory-maps the arrays saved under path by save(path, name).
+        """
+        load = lambda suffix: np.load(os.path.join(path, f"{name}{suffix}.npy"), mmap_mode = "r")
+        data = load("")
+        scale = load("_scale") if data.dtype == np.int8 else None
+        return cls(data, scale, load("_norms"))
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.norms.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def __getitem__(self, rows):
+        block = np.asarray(self.data[rows], dtype = np.float32)
+        if self.scale is not None:
+            scale = self.scale[rows]
+            block = block * (scale[..., None] if np.ndim(scale) else scale)
+        return block
+
+    def __array__(self, dtype = None, copy = None):
+        return self[:] if dtype is None else self[:].astype(dtype)
+
+    def take(self, rows):
+        """
+        The given rows, still in compact form.
+        """
+        return CompactVectors(
+            np.asarray(self.data[rows]), None if self.scale is None else np.asarray(self.scale[rows]), self.norms[rows]
+        )
+
+    def blocks(self):
+        for start in range(0, len(self.data), BLOCK_ROWS):
+            yield self[start:start + BLOCK_ROWS]
+
+    def dot(self, queries):
+        """
+        queries @ rows.T for a (queries x dim) float32 matrix.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype = np.float32))
+        if self.precision == "float32":
+            return queries @ np.asarray(self.data).T
+        return np.concatenate([queries @ block.T for block in self.blocks()] or [np.zeros((len(queries), 0), dtype = np.float32)], axis = 1)
+
+    def cosine(self, queries, rows = None):
+        """
+        Cosine similarity of every query with every row (or only the given rows).
+        Zero vectors have no similarity.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype = np.float32))
+        if rows is None:
+            dots, norms = self.dot(queries), self.norms
+        else:
+            dots, norms = queries @ self[rows].T, self.norms[rows]
+        norms = np.outer(np.linalg.norm(queries, axis = 1), norms)
+        return np.divide(dots, norms, out = np.zeros_like(dots), where = norms > 0)
@@ -0,0 +1,132 @@
+import re
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class EmbeddingCache:
+    """
+    Embedding cache for short strings such as skills, keyed by model name and the
+    normalized string. Keeps a bounded in-memory LRU and, if db_path is given, a
+    SQLite store that survives restarts and is shared between processes.
+
+    Only misses are sent to the model, in one batched encode call.
+    """
+
+    def __init__(self, model, model_name, max_entries = DEFAULT_MAX_ENTRIES, db_path = None):
+        self.model = model
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread = False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, text))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize(text):
+        return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last = False)
+
+    def _load_from_disk(self, keys):
+        if self._db is None or not keys:
+            return {}
+        found = {}
+        keys = list(keys)
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = self._db.execute(
+                f"SELECT text, vector FROM embeddings WHERE model = ? AND text IN ({placeholders})",
+                [self.model_name] + batch
+            ).fetchall()
+            for text, blob in rows:
+                found[text] = np.frombuffer(blob, dtype = np.float32)
+        return found
+
+    def _save_to_disk(self, vectors):
+        if self._db is None or not vectors:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text, vector) VALUES (?, ?, ?)",
+            [(self.model_name, text, vector.astype(np.float32).tobytes()) for text, vector in vectors.items()]
+        )
+        self._db.commit()
+
+    def encode(self, texts):
+        """
+        Returns a (len(texts), dim) float32 matrix of embeddings, in order.
+        """
+        keys = [self.normalize(text) for text in texts]
+        if not keys:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype = np.float32)
+
+        # The lock only guards the LRU and the SQLite connection: the model encodes
+        # outside it, so threads sharing the cache encode their misses in parallel
+        with self._lock:
+            vectors = {}
+            for key in dict.fromkeys(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    vectors[key] = self._entries[key]
+                    self.hits += 1
+
+            missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+            from_disk = self._load_from_disk(missing)
+            self.disk_hits += len(from_disk)
+            vectors.update(from_disk)
+            for key, vector in from_disk.items():
+                self._remember(key, vector)
+
+            to_encode = [key for key in missing if key not in from_disk]
+            self.misses += len(to_encode)
+
+        if to_encode:
+            # Another thread may encode the same strings meanwhile; both store the same vector
+            embeddings = self.model.encode(to_encode, convert_to_numpy = True).astype(np.float32)
+            encoded = dict(zip(to_encode, embeddings))
+            vectors.update(encoded)
+            with self._lock:
+                self._save_to_disk(encoded)
+                for key, vector in encoded.items():
+                    self._remember(key, vector)
+
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,201 @@
+import os
+import ast
+import json
+import hashlib
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from SharedArrays import publish_directory
+
+CATALOGUE_DIR = "job_catalogue"
+# Bump when the compiled columns change so older artifacts are recompiled
+CATALOGUE_VERSION = 1
+
+EDUCATION_LEVELS = {
+    "High School": 1,
+    "Diploma": 2,
+    "Polytechnic": 2,
+    "Bachelor": 3,
+    "Master": 4,
+    "PhD": 5
+}
+
+# Columns derived by the compiler; not part of the catalogue contents
+DERIVED_COLUMNS = ["Education Rank"]
+
+
+def parse_skills(cell):
+    """
+    Parses a "Hard Skills"/"Soft Skills" cell into a list of lowercased, stripped skills.
+    """
+    skills = ast.literal_eval(cell) if isinstance(cell, str) else cell
+    return [skill.lower().strip() for skill in skills if isinstance(skill, str) and skill.strip()]
+
+
+def canonical_frame(job_data):
+    """
+    The catalogue contents with parsed skill lists and without derived columns, so
+    a CSV frame and a compiled frame of the same catalogue hash the same.
+    """
+    job_data = job_data.drop(columns = [column for column in DERIVED_COLUMNS if column in job_data])
+    text_columns = [column for column in JobCatalogue.TEXT_COLUMNS if column in job_data]
+    parsed = {column: job_data[column].apply(parse_skills) for column in JobCatalogue.SKILL_COLUMNS if column in job_data}
+    return job_data.assign(**job_data[text_columns].fillna("").astype(str), **parsed)
+
+
+class JobCatalogue:
+    """
+    The job catalogue compiled once from job_data.csv into typed columns saved
+    under job_catalogue/<key>/, where the key is a hash of the CSV file:
+
+        job_ids, years_of_experience         - numeric columns as read from the CSV
+        job_title, industry, ...             - text columns as fixed-width unicode arrays
+        education_level                      - "Required Education" as an EDUCATION_LEVELS rank (0 if unknown)
+        hard_skill_ids/_offsets, soft_...    - parsed, lowercased skills as ids into skill_vocab, in CSR
+
+    Loading memory-maps the columns read-only, so requests never re-parse the
+    skill lists. load_job_data keeps one catalogue per CSV file per process and
+    reloads it when the file changes, so frame() is built once per CSV version.
+    """
+    TEXT_COLUMNS = {
+        "Job Title": "job_title",
+        "Industry": "industry",
+        "Required Education": "required_education",
+        "Required Degree Field": "required_degree_field",
+    }
+    NUMERIC_COLUMNS = {"Job ID": "job_ids", "Years of Experience": "years_of_experience"}
+    SKILL_COLUMNS = {"Hard Skills": "hard", "Soft Skills": "soft"}
+
+    def __init__(self, path, meta, arrays):
+        self.path = path
+        self.meta = meta
+        self.skill_vocab = arrays.pop("skill_vocab")
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self._frame = None
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @staticmethod
+    def source_key(csv_path):
+        """
+        Hash of the CSV file bytes, so a compiled catalogue is found without parsing the CSV.
+        """
+        digest = hashlib.sha256(f"{CATALOGUE_VERSION}:".encode("utf-8"))
+        with open(csv_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def compile(cls, job_data, path):
+        """
+        Converts a catalogue DataFrame (as read from the CSV) into typed columns
+        saved under path, and loads the result.
+        """
+        arrays = {}
+        for column, name in cls.NUMERIC_COLUMNS.items():
+            arrays[name] = job_data[column].to_numpy()
+        for column, name in cls.TEXT_COLUMNS.items():
+            arrays[name] = job_data[column].fillna("").astype(str).to_numpy(dtype = str)
+        arrays["education_level"] = job_data["Required Education"].map(EDUCATION_LEVELS).fillna(0).to_numpy(dtype = np.int8)
+
+        skill_lists = {kind: job_data[column].apply(parse_skills).tolist() for column, kind in cls.SKILL_COLUMNS.items()}
+        vocabulary = sorted({skill for skills in skill_lists.values() for row in skills for skill in row})
+        skill_ids = {skill: i for i, skill in enumerate(vocabulary)}
+        for kind, rows in skill_lists.items():
+            arrays[f"{kind}_skill_offsets"] = np.concatenate([[0], np.cumsum([len(row) for row in rows])]).astype(np.int64)
+            arrays[f"{kind}_skill_ids"] = np.array([skill_ids[skill] for row in rows for skill in row], dtype = np.int32)
+
+        meta = {"version": CATALOGUE_VERSION, "n_jobs": len(job_data), "n_skills": len(vocabulary), "columns": sorted(arrays)}
+
+        def write(tmp_path):
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+            with open(os.path.join(tmp_path, "skill_vocab.json"), "w") as f:
+                json.dump(vocabulary, f)
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump(meta, f, indent = 2)
+
+        publish_directory(path, write)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(path, "skill_vocab.json")) as f:
+            arrays = {"skill_vocab": json.load(f)}
+        for name in meta["columns"]:
+            arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode = "r")
+        return cls(path, meta, arrays)
+
+    @classmethod
+    def load_or_compile(cls, csv_path = "job_data.csv", catalogue_dir = CATALOGUE_DIR):
+        """
+        Returns the compiled catalogue for this CSV file, compiling it on first use.
+        """
+        path = os.path.join(catalogue_dir, cls.source_key(csv_path))
+        if os.path.exists(os.path.join(path, "meta.json")):
+            return cls.load(path)
+        catalogue = cls.compile(pd.read_csv(csv_path), path)
+        print(f"✅ Job catalogue compiled at {path}")
+        return catalogue
+
+    def skills(self, kind):
+        """
+        Every job's skills of the given kind ("hard" or "soft") as lists of strings.
+        """
+        ids, offsets = getattr(self, f"{kind}_skill_ids"), getattr(self, f"{kind}_skill_offsets")
+        names = np.array(self.skill_vocab, dtype = object)[np.asarray(ids)]
+        return [row.tolist() for row in np.split(names, np.asarray(offsets[1:-1]))]
+
+    def frame(self):
+        """
+        The catalogue as a DataFrame with the CSV's columns (skills as parsed lists)
+        plus "Education Rank". Built once; callers must not modify it.
+        """
+        if self._frame is None:
+            columns = {
+                "Job ID": np.asarray(self.job_ids),
+                **{column: np.asarray(getattr(self, name)).astype(object) for column, name in self.TEXT_COLUMNS.items()},
+                "Years of Experience": np.asarray(self.years_of_experience),
+                **{column: self.skills(kind) for column, kind in self.SKILL_COLUMNS.items()},
+                "Education Rank": np.asarray(self.education_level),
+            }
+            order = ["Job ID", "Job Title", "Industry", "Required Education", "Required Degree Field",
+                     "Years of Experience", "Hard Skills", "Soft Skills", "Education Rank"]
+            self._frame = pd.DataFrame({column: columns[column] for column in order})
+        return self._frame
+
+
+_catalogues = {}
+_catalogues_lock = threading.Lock()
+
+
+def load_job_data(csv_path = "job_data.csv", catalogue_dir = CATALOGUE_DIR):
+    """
+    The job catalogue DataFrame for csv_path, from its compiled columns. The
+    catalogue is loaded once per process and reloaded when the CSV file changes;
+    callers share the frame and must not modify it.
+    """
+    stat = os.stat(csv_path)
+    key = (os.path.abspath(csv_path), os.path.abspath(catalogue_dir))
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _catalogues_lock:
+        cached = _catalogues.get(key)
+        if cached is None or cached[0] != version:
+            cached = _catalogues[key] = (version, JobCatalogue.load_or_compile(csv_path, catalogue_dir))
+    return cached[1].frame()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Compile the job catalogue CSV into typed columns.")
+    arg_parser.add_argument("--csv", default = "job_data.csv")
+    arg_parser.add_argument("--catalogue-dir", default = CATALOGUE_DIR)
+    args = arg_parser.parse_args()
+
+    catalogue = JobCatalogue.load_or_compile(args.csv, args.catalogue_dir)
+    print(f"{len(catalogue)} jobs, {len(catalogue.skill_vocab)} distinct skills at {catalogue.path}")
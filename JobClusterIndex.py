@@ -0,0 +1,160 @@
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobEmbeddingIndex import JobEmbeddingIndex, INDEX_DIR
+from SharedArrays import publish_directory, shared_array
+
+K_RANGE = range(2, 16)
+SILHOUETTE_SAMPLE_SIZE = 10000
+
+
+class JobClusterIndex:
+    """
+    KMeans fit of the job profile embeddings, built offline and persisted next to
+    the job embedding index. Per request only a nearest-centroid lookup is needed.
+
+    With n_clusters=None, k is chosen from a silhouette/inertia sweep over K_RANGE
+    that is stored with the model.
+    """
+
+    def __init__(self, path, meta, centroids, labels):
+        self.path = path
+        self.meta = meta
+        self.centroids = centroids
+        self.labels = labels
+        self.n_clusters = len(centroids)
+
+        # Row positions of the jobs grouped by cluster (shared by all processes via
+        # a file next to the fit), and where each cluster's group starts
+        sort_labels = lambda: np.argsort(labels, kind = "stable")
+        self.order = shared_array(os.path.join(path, "order.npy"), sort_labels) if path else sort_labels()
+        self.bounds = np.searchsorted(labels[self.order], np.arange(self.n_clusters + 1))
+        self._members = [self.order[self.bounds[c]:self.bounds[c + 1]] for c in range(self.n_clusters)]
+
+    @staticmethod
+    def cluster_dir(job_index, n_clusters = None):
+        name = "clusters_auto" if n_clusters is None else f"clusters_k{n_clusters}"
+        return os.path.join(job_index.path, name)
+
+    @staticmethod
+    def sweep(vectors, k_range = K_RANGE, random_state = 42):
+        """
+        Fits KMeans for each k and records inertia and silhouette score.
+        """
+        results = []
+        for k in k_range:
+            if k >= len(vectors):
+                break
+            kmeans = KMeans(n_clusters = k, random_state = random_state).fit(vectors)
+            silhouette = silhouette_score(
+                vectors, kmeans.labels_,
+                sample_size = min(SILHOUETTE_SAMPLE_SIZE, len(vectors)),
+                random_state = random_state
+            )
+            results.append({"k": k, "inertia": float(kmeans.inertia_), "silhouette": float(silhouette)})
+        return results
+
+    @classmethod
+    def build(cls, job_index, n_clusters = None, k_range = K_RANGE, random_state = 42):
+        """
+        Fits KMeans on the job profile embeddings and saves centroids and labels.
+        """
+        # Widened from the stored precision to float32 for the offline fit
+        vectors = np.asarray(job_index.profile, dtype = np.float32)
+
+        auto = n_clusters is None
+        sweep = []
+        if auto:
+            sweep = cls.sweep(vectors, k_range, random_state)
+            best = max(sweep, key = lambda result: result["silhouette"], default = None)
+            n_clusters = best["k"] if best else 1
+
+        kmeans = KMeans(n_clusters = n_clusters, random_state = random_state)
+        labels = kmeans.fit_predict(vectors)
+
+        meta = {
+            "index_key": job_index.meta["key"],
+            "n_clusters": int(n_clusters),
+            "inertia": float(kmeans.inertia_),
+            "sweep": sweep,
+            # Jobs at fit time and jobs added/changed/removed since (see CatalogueManager)
+            "n_fitted": len(vectors),
+            "churn": 0,
+        }
+        path = cls.cluster_dir(job_index, None if auto else n_clusters)
+        clusters = cls.save(path, kmeans.cluster_centers_, labels, meta)
+        print(f"✅ Job clusters (k={n_clusters}) built at {path}")
+        return clusters
+
+    @classmethod
+    def save(cls, path, centroids, labels, meta):
+        """
+        Writes (or replaces) the fit at path atomically and loads it.
+        """
+        def write(tmp_path):
+            np.save(os.path.join(tmp_path, "centroids.npy"), centroids)
+            np.save(os.path.join(tmp_path, "labels.npy"), np.asarray(labels, dtype = np.int32))
+            with open(os.path.join(tmp_path, "clusters.json"), "w") as f:
+                json.dump(meta, f, indent = 2)
+
+        publish_directory(path, write, replace = True)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path):
+        # Read every file from the version path names now, even if a newer fit
+        # is published meanwhile (see publish_directory)
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "clusters.json")) as f:
+            meta = json.load(f)
+        centroids = np.load(os.path.join(path, "centroids.npy"))
+        labels = np.load(os.path.join(path, "labels.npy"), mmap_mode = "r")
+        return cls(path, meta, centroids, labels)
+
+    @classmethod
+    def load_or_build(cls, job_index, n_clusters = None):
+        path = cls.cluster_dir(job_index, n_clusters)
+        if os.path.exists(os.path.join(path, "clusters.json")):
+            return cls.load(path)
+        return cls.build(job_index, n_clusters)
+
+    def nearest_cluster(self, vector):
+        """
+        Returns the cluster whose centroid is closest (Euclidean, as KMeans.predict).
+        """
+        return int(self.nearest_clusters(np.atleast_2d(vector))[0])
+
+    def nearest_clusters(self, vectors):
+        """
+        Nearest centroid for each row of a matrix of vectors.
+        """
+        vectors = np.asarray(vectors, dtype = np.float32)
+        distances = (
+            (vectors ** 2).sum(axis = 1)[:, None]
+            - 2 * vectors @ self.centroids.T
+            + (self.centroids ** 2).sum(axis = 1)[None, :]
+        )
+        return np.argmin(distances, axis = 1)
+
+    def members(self, cluster):
+        return self._members[cluster]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Build the job embedding index and KMeans clusters.")
+    arg_parser.add_argument("--csv", default = "job_data.csv")
+    arg_parser.add_argument("--model", default = MODEL_NAME)
+    arg_parser.add_argument("--index-dir", default = INDEX_DIR)
+    arg_parser.add_argument("--k", type = int, default = None, help = "Number of clusters (default: chosen by silhouette sweep)")
+    args = arg_parser.parse_args()
+
+    job_df = pd.read_csv(args.csv)
+    job_index = JobEmbeddingIndex.load_or_build(job_df, ModelRegistry.get_sentence_model(args.model), args.model, args.index_dir)
+    clusters = JobClusterIndex.build(job_index, args.k)
+    for result in clusters.meta["sweep"]:
+        print(f"k={result['k']}: inertia={result['inertia']:.2f}, silhouette={result['silhouette']:.3f}")
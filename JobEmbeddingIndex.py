@@ -0,0 +1,334 @@
+import os
+import json
+import shutil
+import hashlib
+import weakref
+import argparse
+import numpy as np
+import pandas as pd
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobCatalogue import canonical_frame
+from SharedArrays import publish_directory
+from CompactVectors import CompactVectors, PRECISIONS, embedding_precision
+
+INDEX_DIR = "job_index"
+# Bump when the stored arrays change so older indexes are rebuilt
+INDEX_VERSION = 5
+
+# Upper bound on students x jobs cells scored at once (~16 MB per float32 matrix)
+MAX_CHUNK_CELLS = 4_000_000
+
+# Catalogue hashes by frame id, so each catalogue frame is hashed once per process
+_catalogue_hashes = {}
+
+
+def unit_rows(vectors):
+    """
+    Scales each row to unit length; zero rows stay zero.
+    """
+    vectors = np.asarray(vectors, dtype = np.float32)
+    norms = np.linalg.norm(vectors, axis = 1, keepdims = True)
+    return np.divide(vectors, norms, out = np.zeros_like(vectors), where = norms > 0)
+
+
+def job_profile_text(job_row, hard_skills, soft_skills):
+    """
+    Builds the free-text job profile that is embedded for the clustering algorithm.
+    """
+    return (
+        f"Job Title: {job_row['Job Title']}. "
+        f"Industry: {job_row['Industry']}. "
+        f"Hard Skills required: {', '.join(hard_skills)}. "
+        f"Soft Skills required: {', '.join(soft_skills)}. "
+        f"Required degree field: {job_row['Required Degree Field']}. "
+        f"Required education level: {job_row['Required Education']}. "
+        f"Years of experience required: {job_row['Years of Experience']}."
+    )
+
+
+def student_profile_text(student):
+    """
+    Builds the free-text student profile that is embedded and compared to job profiles.
+    """
+    return (
+        f"Student profile. "
+        f"Hard Skills: {', '.join(student['Hard Skills'])}. "
+        f"Soft Skills: {', '.join(student['Soft Skills'])}. "
+        f"Degree field: {student['Degree Field']}. "
+        f"Education level: {student['Education Level']}. "
+        f"Work experience: {student['Work Experience']} years."
+    )
+
+
+def student_chunks(n_students, n_jobs, chunk_size = None):
+    """
+    Splits students into row slices so each students x jobs matrix stays bounded.
+    """
+    if chunk_size is None:
+        chunk_size = max(1, MAX_CHUNK_CELLS // max(n_jobs, 1))
+    elif chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    return [slice(start, start + chunk_size) for start in range(0, n_students, chunk_size)]
+
+
+class JobEmbeddingIndex:
+    """
+    Precomputed job embeddings, built once per (job catalogue, model, precision)
+    and stored as memory-mappable .npy files under job_index/<key>/.
+
+    Arrays (one row per job, in catalogue order):
+        profile       - embedding of the full job profile text (ClusterProcessor)
+        hard_skills   - mean embedding of the job's hard skills (RecommendationProcessor)
+        soft_skills   - mean embedding of the job's soft skills (RecommendationProcessor)
+        degree_field  - embedding of the required degree field (RecommendationProcessor)
+
+    These are CompactVectors stored at the index precision (EMBEDDING_PRECISION:
+    float32, float16, or int8 with a per-row scale) and scored in that form.
+
+    row_hashes holds a content hash per job so CatalogueManager can find changed jobs.
+
+    Skill arrays (for SkillCoverage):
+        skill_vectors              - unit embedding of every distinct skill, row i = skill_vocab[i]
+        hard_skill_ids/_offsets    - each job's hard skills as ids into skill_vocab, in CSR
+                                     form: job j owns ids[offsets[j]:offsets[j + 1]]
+        soft_skill_ids/_offsets    - the same for soft skills
+    """
+    ARRAYS = ("profile", "hard_skills", "soft_skills", "degree_field")
+    SKILL_ARRAYS = ("skill_vectors", "hard_skill_ids", "hard_skill_offsets", "soft_skill_ids", "soft_skill_offsets")
+
+    def __init__(self, path, meta, arrays):
+        self.path = path
+        self.meta = meta
+        self.job_ids = arrays["job_ids"]
+        self.row_hashes = arrays["row_hashes"]
+        self.skill_vocab = arrays["skill_vocab"]
+        for name in self.ARRAYS:
+            vectors = arrays[name]
+            setattr(self, name, vectors if isinstance(vectors, CompactVectors) else CompactVectors(np.asarray(vectors, dtype = np.float32)))
+        for name in self.SKILL_ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @staticmethod
+    def catalogue_hash(job_data):
+        """
+        Content hash of the job catalogue (CSV-read or compiled, see canonical_frame).
+        Memoised per frame object: catalogue frames are only read, never modified.
+        """
+        key = id(job_data)
+        cached = _catalogue_hashes.get(key)
+        if cached is not None and cached[0]() is job_data:
+            return cached[1]
+        digest = hashlib.sha256(canonical_frame(job_data).to_csv(index = False).encode("utf-8")).hexdigest()
+        # The entry is dropped when the frame is garbage collected, before its id can be reused
+        _catalogue_hashes[key] = (weakref.ref(job_data, lambda _: _catalogue_hashes.pop(key, None)), digest)
+        return digest
+
+    @classmethod
+    def index_key(cls, job_data, model_name = MODEL_NAME, precision = None):
+        precision = embedding_precision(precision)
+        digest = hashlib.sha256(f"{cls.catalogue_hash(job_data)}:{model_name}:{precision}:{INDEX_VERSION}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def take(self, rows):
+        """
+        In-memory index restricted to the given row positions, in that order.
+        """
+        rows = np.asarray(rows, dtype = int)
+        arrays = {
+            "job_ids": self.job_ids[rows], "row_hashes": self.row_hashes[rows],
+            "skill_vocab": self.skill_vocab, "skill_vectors": self.skill_vectors,
+        }
+        for name in self.ARRAYS:
+            arrays[name] = getattr(self, name).take(rows)
+        for kind in ("hard", "soft"):
+            ids, offsets = getattr(self, f"{kind}_skill_ids"), getattr(self, f"{kind}_skill_offsets")
+            counts = offsets[rows + 1] - offsets[rows]
+            arrays[f"{kind}_skill_offsets"] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+            arrays[f"{kind}_skill_ids"] = np.concatenate(
+                [ids[offsets[row]:offsets[row + 1]] for row in rows] + [np.zeros(0, dtype = np.int32)]
+            ).astype(np.int32)
+        # In memory only: the subset has no directory of its own
+        return JobEmbeddingIndex(None, self.meta, arrays)
+
+    def matches(self, job_data):
+        """
+        Checks that the index rows line up with the given job catalogue.
+        """
+        return len(self) == len(job_data) and np.array_equal(self.job_ids, job_data["Job ID"].to_numpy())
+
+    @staticmethod
+    def hash_rows(job_data):
+        """
+        Content hash of each job row, used to find changed jobs between catalogues.
+        """
+        return pd.util.hash_pandas_object(canonical_frame(job_data).astype(str), index = False).to_numpy(dtype = np.uint64)
+
+    @staticmethod
+    def encode_rows(job_data, model, skill_cache = None, vocabulary = None):
+        """
+        Encodes the given job rows. Skills not yet in vocabulary are appended to it.
+        Returns (per-row arrays, the extended vocabulary, unit vectors of the
+        appended skills).
+        """
+        vocabulary = list(vocabulary or [])
+        job_data = canonical_frame(job_data)
+        hard_skills = job_data["Hard Skills"].tolist()
+        soft_skills = job_data["Soft Skills"].tolist()
+        dim = model.get_sentence_embedding_dimension()
+
+        skill_ids = {skill: i for i, skill in enumerate(vocabulary)}
+        new_skills = sorted({skill for skills in hard_skills + soft_skills for skill in skills} - skill_ids.keys())
+        for skill in new_skills:
+            skill_ids[skill] = len(vocabulary)
+            vocabulary.append(skill)
+
+        # Encode every distinct skill of these rows once, then mean-pool per job
+        used = sorted({skill for skills in hard_skills + soft_skills for skill in skills})
+        if skill_cache is not None:
+            skill_vectors = skill_cache.encode(used)
+        else:
+            skill_vectors = model.encode(used, convert_to_numpy = True) if used else np.zeros((0, dim))
+        used_ids = {skill: i for i, skill in enumerate(used)}
+
+        def skill_csr(skill_lists):
+            offsets = np.concatenate([[0], np.cumsum([len(skills) for skills in skill_lists])]).astype(np.int64)
+            ids = np.array([skill_ids[skill] for skills in skill_lists for skill in skills], dtype = np.int32)
+            return ids, offsets
+
+        def mean_pool(skill_lists):
+            pooled = np.zeros((len(skill_lists), dim), dtype = np.float32)
+            for i, skills in enumerate(skill_lists):
+                if skills:
+                    pooled[i] = skill_vectors[[used_ids[skill] for skill in skills]].mean(axis = 0)
+            return pooled
+
+        profile_texts = [
+            job_profile_text(row, hard, soft)
+            for (_, row), hard, soft in zip(job_data.iterrows(), hard_skills, soft_skills)
+        ]
+        degree_fields = job_data["Required Degree Field"].fillna("").astype(str).tolist()
+
+        arrays = {
+            "profile": model.encode(profile_texts, convert_to_numpy = True).astype(np.float32).reshape(-1, dim),
+            "hard_skills": mean_pool(hard_skills),
+            "soft_skills": mean_pool(soft_skills),
+            "degree_field": model.encode(degree_fields, convert_to_numpy = True).astype(np.float32).reshape(-1, dim),
+        }
+        arrays["hard_skill_ids"], arrays["hard_skill_offsets"] = skill_csr(hard_skills)
+        arrays["soft_skill_ids"], arrays["soft_skill_offsets"] = skill_csr(soft_skills)
+        new_vectors = unit_rows(skill_vectors[[used_ids[skill] for skill in new_skills]].reshape(-1, dim))
+        return arrays, vocabulary, new_vectors
+
+    @classmethod
+    def build(cls, job_data, model, model_name = MODEL_NAME, index_dir = INDEX_DIR, skill_cache = None, precision = None):
+        """
+        Encodes every job in the catalogue and saves the index to disk. Skills are
+        encoded through skill_cache when one is given, which also warms it.
+        """
+        arrays, vocabulary, skill_vectors = cls.encode_rows(job_data, model, skill_cache)
+        arrays["skill_vectors"] = skill_vectors
+        index = cls.save(job_data, model_name, index_dir, arrays, vocabulary, precision)
+        print(f"✅ Job embedding index built at {index.path}")
+        return index
+
+    @classmethod
+    def save(cls, job_data, model_name, index_dir, arrays, vocabulary, precision = None, **meta):
+        """
+        Writes the arrays for job_data (in catalogue order) to job_index/<key>/, the
+        embeddings at the given precision, and loads the result. Extra keyword
+        arguments are stored in meta.json.
+        """
+        precision = embedding_precision(precision)
+        key = cls.index_key(job_data, model_name, precision)
+        path = os.path.join(index_dir, key)
+        vectors = {name: CompactVectors.encode(arrays[name], precision) for name in cls.ARRAYS}
+        arrays = {name: array for name, array in arrays.items() if name not in vectors}
+        arrays.update(job_ids = job_data["Job ID"].to_numpy(), row_hashes = cls.hash_rows(job_data))
+        meta = {
+            "key": key,
+            "model_name": model_name,
+            "catalogue_hash": cls.catalogue_hash(job_data),
+            "n_jobs": len(job_data),
+            "version": INDEX_VERSION,
+            "precision": precision,
+            "dim": vectors["profile"].shape[1],
+            **meta,
+        }
+
+        def write(tmp_path):
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+            for name, compact in vectors.items():
+                compact.save(tmp_path, name)
+            with open(os.path.join(tmp_path, "skill_vocab.json"), "w") as f:
+                json.dump(vocabulary, f)
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump(meta, f, indent = 2)
+
+        if os.path.isdir(path) and not os.path.exists(os.path.join(path, "meta.json")):
+            # Left over from an interrupted build
+            shutil.rmtree(path)
+        # Published atomically, so concurrent workers never map a half-written index
+        publish_directory(path, write)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a saved index, memory-mapping every array read-only: processes that
+        load the same index share its pages instead of holding a copy each.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(path, "skill_vocab.json")) as f:
+            skill_vocab = json.load(f)
+        arrays = {
+            "job_ids": np.load(os.path.join(path, "job_ids.npy"), mmap_mode = "r"),
+            "row_hashes": np.load(os.path.join(path, "row_hashes.npy"), mmap_mode = "r"),
+            "skill_vocab": skill_vocab,
+        }
+        for name in cls.ARRAYS:
+            arrays[name] = CompactVectors.load(path, name)
+        for name in cls.SKILL_ARRAYS:
+            arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode = "r")
+        return cls(path, meta, arrays)
+
+    @classmethod
+    def load_or_build(cls, job_data, model, model_name = MODEL_NAME, index_dir = INDEX_DIR, skill_cache = None, precision = None):
+        """
+        Returns the index for this catalogue, model and precision, building it on first use.
+        """
+        path = os.path.join(index_dir, cls.index_key(job_data, model_name, precision))
+        if os.path.exists(os.path.join(path, "meta.json")):
+            return cls.load(path)
+        return cls.build(job_data, model, model_name, index_dir, skill_cache, precision)
+
+    @classmethod
+    def for_catalogue(cls, job_data, model, job_index = None, model_name = MODEL_NAME, skill_cache = None):
+        """
+        Returns job_index (or the stored index for job_data), checking that its rows
+        line up with the catalogue.
+        """
+        if job_index is None:
+            job_index = cls.load_or_build(job_data, model, model_name, skill_cache = skill_cache)
+        if not job_index.matches(job_data):
+            raise ValueError("Job embedding index does not match the job catalogue.")
+        return job_index
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Build the job embedding index.")
+    arg_parser.add_argument("--csv", default = "job_data.csv")
+    arg_parser.add_argument("--model", default = MODEL_NAME)
+    arg_parser.add_argument("--index-dir", default = INDEX_DIR)
+    arg_parser.add_argument("--precision", choices = PRECISIONS, default = None, help = "Embedding storage precision (default: EMBEDDING_PRECISION or float32)")
+    args = arg_parser.parse_args()
+
+    job_df = pd.read_csv(args.csv)
+    JobEmbeddingIndex.load_or_build(
+        job_df, ModelRegistry.get_sentence_model(args.model), args.model, args.index_dir,
+        skill_cache = ModelRegistry.get_skill_cache(args.model), precision = args.precision
+    )
@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from collections import deque, defaultdict
+from contextlib import contextmanager
+
+# Samples kept per stage for percentiles (a sliding window of the latest calls)
+WINDOW_SIZE = 10000
+QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_PREFIX = "career_recommender"
+
+
+class InMemorySink:
+    """
+    Keeps the latest max_events events, for tests and notebooks.
+    """
+    def __init__(self, max_events = WINDOW_SIZE):
+        self.events = deque(maxlen = max_events)
+
+    def emit(self, event, metrics):
+        self.events.append(event)
+
+    def flush(self, metrics):
+        pass
+
+
+class JSONLogSink:
+    """
+    Logs each event as one JSON line through the standard logging module.
+    """
+    def __init__(self, logger_name = "metrics", level = logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def emit(self, event, metrics):
+        self.logger.log(self.level, json.dumps(event, default = str))
+
+    def flush(self, metrics):
+        pass
+
+
+class PrometheusFileSink:
+    """
+    Writes the stage summaries in the Prometheus text format to a file, e.g. for the
+    node_exporter textfile collector. The file is rewritten at most every interval
+    seconds, and on flush().
+    """
+    def __init__(self, path = "metrics.prom", interval = 10.0):
+        self.path = path
+        self.interval = interval
+        self.last_write = 0.0
+
+    def emit(self, event, metrics):
+        if time.monotonic() - self.last_write >= self.interval:
+            self.flush(metrics)
+
+    def flush(self, metrics):
+        self.last_write = time.monotonic()
+        lines = []
+        for kind, unit, samples in (("stage", "seconds", metrics.durations), ("value", "", metrics.values)):
+            name = f"{PROMETHEUS_PREFIX}_{kind}" + (f"_{unit}" if unit else "")
+            lines.append(f"# TYPE {name} summary")
+            for stage, summary in metrics.snapshot(samples).items():
+                for quantile, value in summary["quantiles"].items():
+                    lines.append(f'{name}{{{kind}="{stage}",quantile="{quantile}"}} {value:.6g}')
+                lines.append(f'{name}_sum{{{kind}="{stage}"}} {summary["sum"]:.6g}')
+                lines.append(f'{name}_count{{{kind}="{stage}"}} {summary["count"]}')
+        # A temporary file per write: service threads (or processes) sharing the path
+        # may flush at the same time, and each replaces the file with a whole one
+        tmp_path = f"{self.path}.tmp-{uuid.uuid4().hex[:8]}"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+class Metrics:
+    """
+    Timing and metrics for the pipeline stages. Spans record wall-clock durations
+    per stage name and observe() records other values (e.g. encode batch sizes);
+    both keep a window of recent samples for p50/p95/p99 and send every event to
+    the configured sinks.
+    """
+
+    def __init__(self, sinks = None, window_size = WINDOW_SIZE):
+        self.sinks = list(sinks or [])
+        self.window_size = window_size
+        self.durations = defaultdict(lambda: deque(maxlen = self.window_size))
+        self.values = defaultdict(lambda: deque(maxlen = self.window_size))
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def _emit(self, event):
+        for sink in self.sinks:
+            try:
+                sink.emit(event, self)
+            except Exception as e:
+                # Metrics must never break a request
+                print(f"❌ Metrics sink {type(sink).__name__} failed: {e}")
+
+    def record(self, name, seconds, **labels):
+        with self._lock:
+            self.durations[name].append(seconds)
+        self._emit({"type": "span", "name": name, "seconds": seconds, "labels": labels, "timestamp": time.time()})
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            self.values[name].append(value)
+        self._emit({"type": "value", "name": name, "value": value, "labels": labels, "timestamp": time.time()})
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Times the enclosed block as one sample of stage name. Yields the labels dict
+        so the block can add labels (e.g. a result size) before it is recorded.
+        """
+        start = time.perf_counter()
+        try:
+            yield labels
+        except Exception as e:
+            labels["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self, samples):
+        with self._lock:
+            copies = {name: np.array(values, dtype = float) for name, values in samples.items() if values}
+        summaries = {}
+        for name, values in copies.items():
+            summaries[name] = {
+                "count": len(values),
+                "sum": float(values.sum()),
+                "quantiles": {quantile: float(np.quantile(values, quantile)) for quantile in QUANTILES},
+            }
+        return summaries
+
+    def summary(self):
+        """
+        Per stage: call count and mean/p50/p95/p99 in milliseconds over the window;
+        per observed value: the same statistics in the value's own unit.
+        """
+        report = {}
+        for kind, samples, scale in (("stages", self.durations, 1000), ("values", self.values, 1)):
+            suffix = "_ms" if scale == 1000 else ""
+            report[kind] = {
+                name: {
+                    "count": summary["count"],
+                    f"mean{suffix}": round(summary["sum"] / summary["count"] * scale, 3),
+                    **{f"p{int(quantile * 100)}{suffix}": round(value * scale, 3) for quantile, value in summary["quantiles"].items()},
+                }
+                for name, summary in self.snapshot(samples).items()
+            }
+        return report
+
+    def print_summary(self):
+        report = self.summary()
+        print(f"\n{'Stage':<40} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+        for name, stats in sorted(report["stages"].items()):
+            print(f"{name:<40} {stats['count']:>7} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+        for name, stats in sorted(report["values"].items()):
+            print(f"{name:<40} {stats['count']:>7} {stats['p50']:>10.3f} {stats['p95']:>10.3f} {stats['p99']:>10.3f}")
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush(self)
+
+    def reset(self):
+        with self._lock:
+            self.durations.clear()
+            self.values.clear()
+
+
+class TimedEncoder:
+    """
+    Wraps a SentenceTransformer so every encode call is recorded as an "encode"
+    span with its batch size. Other attributes are passed through to the model.
+    """
+    def __init__(self, model, metrics = None):
+        self.model = model
+        self.metrics = metrics
+
+    def encode(self, sentences, *args, **kwargs):
+        metrics = self.metrics or get_metrics()
+        batch_size = 1 if isinstance(sentences, str) else len(sentences)
+        metrics.observe("encode_batch_size", batch_size)
+        with metrics.span("encode", batch_size = batch_size):
+            return self.model.encode(sentences, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def sinks_from_env():
+    """
+    Sinks named in METRICS_SINKS (comma separated: memory, json, prometheus). The
+    Prometheus file path is METRICS_PROMETHEUS_FILE (default metrics.prom).
+    """
+    sinks = []
+    for name in filter(None, (part.strip().lower() for part in os.getenv("METRICS_SINKS", "").split(","))):
+        if name == "memory":
+            sinks.append(InMemorySink())
+        elif name == "json":
+            sinks.append(JSONLogSink())
+        elif name == "prometheus":
+            sinks.append(PrometheusFileSink(os.getenv("METRICS_PROMETHEUS_FILE", "metrics.prom")))
+        else:
+            raise ValueError(f"Unknown metrics sink: {name}")
+    return sinks
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    Process-wide Metrics instance, with sinks configured from the environment.
+    """
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                load_dotenv()
+                _metrics = Metrics(sinks_from_env())
+    return _metrics
+
+
+def set_metrics(metrics):
+    """
+    Replaces the process-wide Metrics instance, e.g. in a worker process whose
+    events are sent back to the parent instead of to the configured sinks.
+    """
+    global _metrics
+    with _metrics_lock:
+        _metrics = metrics
+    return metrics
@@ -0,0 +1,110 @@
+import os
+import threading
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+SPACY_MODEL = "en_core_web_lg"
+# No extraction stage uses dependency parses or named entities. skillNer needs
+# lemmas and stop words (tagger, attribute_ruler, lemmatizer); its output is
+# checked against the full pipeline by: python StudentInfoExtractor.py --check
+SPACY_EXCLUDE = ["parser", "ner"]
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of the heavy NLP models. Each model is loaded lazily on
+    first use and then shared by every extractor/processor in the process.
+    """
+    _models = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def _get_or_load(cls, key, loader):
+        model = cls._models.get(key)
+        if model is None:
+            with cls._lock:
+                # Re-check under the lock so concurrent callers load only once
+                model = cls._models.get(key)
+                if model is None:
+                    model = loader()
+                    cls._models[key] = model
+        return model
+
+    @classmethod
+    def get_sentence_model(cls, name = MODEL_NAME):
+        def load():
+            from sentence_transformers import SentenceTransformer
+            from Metrics import TimedEncoder
+            # Every encode call is recorded as an "encode" span with its batch size
+            return TimedEncoder(SentenceTransformer(name))
+        return cls._get_or_load(("sentence_transformer", name), load)
+
+    @classmethod
+    def get_nlp(cls, name = SPACY_MODEL):
+        def load():
+            import spacy
+            return spacy.load(name, exclude = SPACY_EXCLUDE)
+        return cls._get_or_load(("spacy", name), load)
+
+    @classmethod
+    def get_skill_extractor(cls, name = SPACY_MODEL):
+        def load():
+            from spacy.matcher import PhraseMatcher
+            from skillNer.general_params import SKILL_DB
+            from skillNer.skill_extractor_class import SkillExtractor
+            nlp = cls.get_nlp(name)
+            extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
+            # annotate tags its cleaned copy of the text once for lemmas and stop
+            # words, then runs nlp again on five rewritten copies for LOWER phrase
+            # matching and on word pairs for static-vector similarity. Those
+            # passes only need tokens, so they skip the pipeline components
+            extractor.skill_getters.nlp = nlp.make_doc
+            extractor.utils.nlp = nlp.make_doc
+            return extractor
+        return cls._get_or_load(("skill_extractor", name), load)
+
+    @classmethod
+    def get_soft_skill_matcher(cls, name = SPACY_MODEL):
+        def load():
+            from StudentInfoExtractor import SoftSkillMatcher, StudentInfoExtractor
+            return SoftSkillMatcher(cls.get_nlp(name), StudentInfoExtractor.load_soft_skills_list())
+        return cls._get_or_load(("soft_skill_matcher", name), load)
+
+    @classmethod
+    def get_university_index(cls, path = None):
+        """
+        University name index, loaded from UNIVERSITY_FILE (default universities.txt).
+        """
+        def load():
+            from UniversityIndex import UniversityIndex, UNIVERSITY_FILE
+            return UniversityIndex.load(path or os.getenv("UNIVERSITY_FILE", UNIVERSITY_FILE))
+        return cls._get_or_load(("university_index", path), load)
+
+    @classmethod
+    def get_skill_cache(cls, name = MODEL_NAME):
+        """
+        Embedding cache for skill strings. Set SKILL_CACHE_PATH to also keep the
+        embeddings in a SQLite file across restarts.
+        """
+        def load():
+            from EmbeddingCache import EmbeddingCache
+            return EmbeddingCache(cls.get_sentence_model(name), name, db_path = os.getenv("SKILL_CACHE_PATH"))
+        return cls._get_or_load(("skill_cache", name), load)
+
+    @classmethod
+    def warm_up(cls):
+        """
+        Loads every model up front, e.g. at server start, so the first request
+        does not pay the load cost.
+        """
+        cls.get_sentence_model()
+        cls.get_skill_cache()
+        cls.get_nlp()
+        cls.get_skill_extractor()
+        cls.get_soft_skill_matcher()
+        cls.get_university_index()
+        print("✅ Models loaded")
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._models.clear()
@@ -0,0 +1,229 @@
+import os
+import io
+import time
+import uuid
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTContainer, LTText, LTTextBox
+
+# Resumes rarely exceed 3 pages; anything past these budgets is not read
+MAX_PAGES = 5
+MAX_CHARS = 20000
+# Seconds a single PDF may take before its extraction process is killed
+TIMEOUT = 20
+PDF_CACHE_DIR = "pdf_text_cache"
+# Extracted resumes are personal data: the cache keeps at most this many texts,
+# each for at most this many seconds since it was last read
+CACHE_MAX_ENTRIES = 1000
+CACHE_TTL = 7 * 24 * 3600
+# Bump when the extracted text changes so cached texts are re-extracted
+INGEST_VERSION = 1
+
+
+def page_text(page):
+    """
+    Text of one pdfminer layout page, laid out as pdfminer's extract_text does.
+    """
+    parts = []
+    def render(item):
+        if isinstance(item, LTContainer):
+            for child in item:
+                render(child)
+        elif isinstance(item, LTText):
+            parts.append(item.get_text())
+        if isinstance(item, LTTextBox):
+            parts.append("\n")
+    render(page)
+    return "".join(parts) + "\f"
+
+
+def read_pages(source, max_pages = MAX_PAGES, max_chars = MAX_CHARS):
+    """
+    Reads pages lazily until max_pages pages or max_chars characters have been
+    read. Returns the text (cut at max_chars) and the number of pages read.
+    """
+    pages, n_chars = [], 0
+    for page in extract_pages(source, maxpages = max_pages or 0):
+        pages.append(page_text(page))
+        n_chars += len(pages[-1])
+        if max_chars and n_chars >= max_chars:
+            break
+    text = "".join(pages)
+    return (text[:max_chars] if max_chars else text), len(pages)
+
+
+def _read_pages_worker(conn, data, max_pages, max_chars):
+    try:
+        conn.send(("ok", read_pages(io.BytesIO(data), max_pages, max_chars)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class PdfIngestor:
+    """
+    Extracts resume text from a PDF (a path, bytes or a file object). Pages are
+    parsed lazily and parsing stops at the page/character budget. With a timeout,
+    parsing runs in a child process that is killed when the timeout passes, so a
+    malformed or very long PDF cannot pin the caller. Extracted texts are cached
+    in cache_dir by file hash, so the same PDF is only parsed once. The cache is
+    an LRU bounded to max_entries texts; texts not read for ttl seconds expire.
+
+    Unreadable PDFs raise ValueError; PDFs that time out raise TimeoutError.
+    """
+
+    def __init__(self, max_pages = MAX_PAGES, max_chars = MAX_CHARS, timeout = TIMEOUT, cache_dir = PDF_CACHE_DIR,
+                 max_entries = CACHE_MAX_ENTRIES, ttl = CACHE_TTL):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def cache_key(self, data):
+        digest = hashlib.sha256(f"{INGEST_VERSION}:{self.max_pages}:{self.max_chars}:".encode("utf-8"))
+        digest.update(data)
+        return digest.hexdigest()[:32]
+
+    def ingest(self, source):
+        """
+        Returns {"text", "pages", "cached"} for the PDF; pages is None for a cached text.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            data = bytes(source)
+        elif hasattr(source, "read"):
+            data = source.read()
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+
+        cache_path = os.path.join(self.cache_dir, f"{self.cache_key(data)}.txt") if self.cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            if time.time() - os.path.getmtime(cache_path) <= self.ttl:
+                with open(cache_path, encoding = "utf-8") as f:
+                    text = f.read()
+                # The modification time records the last use, for LRU eviction
+                os.utime(cache_path)
+                return {"text": text, "pages": None, "cached": True}
+
+        text, n_pages = self.read(data)
+        if cache_path:
+            os.makedirs(self.cache_dir, exist_ok = True)
+            tmp_path = f"{cache_path}.tmp-{uuid.uuid4().hex[:8]}"
+            with open(tmp_path, "w", encoding = "utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+            self.prune()
+        return {"text": text, "pages": n_pages, "cached": False}
+
+    def prune(self):
+        """
+        Deletes cached texts older than ttl, then the least recently used ones
+        beyond max_entries. Returns the number deleted.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+            if not name.endswith(".txt"):
+                continue    # a text still being written
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.cache_dir, name)), name))
+            except FileNotFoundError:
+                continue    # deleted by another process
+        entries.sort(reverse = True)
+        now = time.time()
+        expired = [name for i, (used, name) in enumerate(entries) if i >= self.max_entries or now - used > self.ttl]
+        for name in expired:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+        return len(expired)
+
+    def extract(self, source):
+        return self.ingest(source)["text"]
+
+    def read(self, data):
+        """
+        Parses the PDF bytes within the budget, in a child process if a timeout is set.
+        """
+        if not self.timeout:
+            try:
+                return read_pages(io.BytesIO(data), self.max_pages, self.max_chars)
+            except Exception as e:
+                raise ValueError(f"Could not read PDF: {type(e).__name__}: {e}") from e
+
+        receiver, sender = multiprocessing.Pipe(duplex = False)
+        process = multiprocessing.Process(
+            target = _read_pages_worker, args = (sender, data, self.max_pages, self.max_chars), daemon = True
+        )
+        process.start()
+        sender.close()
+        try:
+            if not receiver.poll(self.timeout):
+                raise TimeoutError(f"PDF extraction took longer than {self.timeout}s")
+            status, result = receiver.recv()
+        except EOFError:
+            status, result = "error", f"extraction process exited with code {process.exitcode}"
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.kill()
+            process.join()
+
+        if status == "error":
+            raise ValueError(f"Could not read PDF: {result}")
+        return result
+
+
+_pdf_ingestor = None
+_pdf_ingestor_lock = threading.Lock()
+
+
+def get_pdf_ingestor():
+    """
+    Process-wide ingestor configured from PDF_MAX_PAGES, PDF_MAX_CHARS, PDF_TIMEOUT
+    (0 disables the child process), PDF_CACHE_DIR (empty disables the cache),
+    PDF_CACHE_MAX_ENTRIES and PDF_CACHE_TTL (seconds).
+    """
+    global _pdf_ingestor
+    if _pdf_ingestor is None:
+        with _pdf_ingestor_lock:
+            if _pdf_ingestor is None:
+                _pdf_ingestor = PdfIngestor(
+                    max_pages = int(os.getenv("PDF_MAX_PAGES", str(MAX_PAGES))),
+                    max_chars = int(os.getenv("PDF_MAX_CHARS", str(MAX_CHARS))),
+                    timeout = float(os.getenv("PDF_TIMEOUT", str(TIMEOUT))),
+                    cache_dir = os.getenv("PDF_CACHE_DIR", PDF_CACHE_DIR),
+                    max_entries = int(os.getenv("PDF_CACHE_MAX_ENTRIES", str(CACHE_MAX_ENTRIES))),
+                    ttl = float(os.getenv("PDF_CACHE_TTL", str(CACHE_TTL))),
+                )
+    return _pdf_ingestor
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Extract the text of resume PDFs within a page/character budget.")
+    arg_parser.add_argument("pdfs", nargs = "*")
+    arg_parser.add_argument("--max-pages", type = int, default = MAX_PAGES)
+    arg_parser.add_argument("--max-chars", type = int, default = MAX_CHARS)
+    arg_parser.add_argument("--timeout", type = float, default = TIMEOUT, help = "Seconds per PDF (0: no child process)")
+    arg_parser.add_argument("--cache-dir", default = PDF_CACHE_DIR, help = "Extracted text cache (empty: no cache)")
+    arg_parser.add_argument("--prune", action = "store_true", help = "Only delete expired and excess cached texts")
+    args = arg_parser.parse_args()
+
+    ingestor = PdfIngestor(args.max_pages, args.max_chars, args.timeout, args.cache_dir)
+    if args.prune:
+        print(f"✅ Removed {ingestor.prune()} cached text(s) from {args.cache_dir}")
+        raise SystemExit(0)
+    for pdf_path in args.pdfs:
+        try:
+            result = ingestor.ingest(pdf_path)
+        except (ValueError, TimeoutError) as e:
+            print(f"❌ {pdf_path}: {e}")
+            continue
+        source = "cache" if result["cached"] else f"{result['pages']} page(s)"
+        print(f"✅ {pdf_path}: {len(result['text'])} characters from {source}")
@@ -1,71 +1,111 @@
 import pandas as pd
 import numpy as np
-import math
-import ast
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer, util
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobCatalogue import EDUCATION_LEVELS
+from JobEmbeddingIndex import JobEmbeddingIndex, student_profile_text, student_chunks
+from ANNIndex import get_search_index
+from SkillCoverage import SkillCoverage
+from Metrics import get_metrics
+
+
+DEFAULT_CANDIDATES = 50
+# "mean": cosine of mean-pooled skill embeddings; "coverage": SkillCoverage
+SKILL_SCORING = ("mean", "coverage")
 
 
 class RecommendationProcessor:
-    def __init__(self, student_profile, job_data):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    EDUCATION_LEVELS = EDUCATION_LEVELS
+
+    def __init__(self, student_profile, job_data, job_index = None, skill_scoring = "mean"):
+        if skill_scoring not in SKILL_SCORING:
+            raise ValueError(f"Unknown skill scoring: {skill_scoring}")
+        self.model = ModelRegistry.get_sentence_model(MODEL_NAME)
         self.student = student_profile
         self.job_data = job_data
+        self.skill_scoring = skill_scoring
 
-        # Preprocess skills
-        self.job_data["Hard Skills"] = self.job_data["Hard Skills"].apply(ast.literal_eval)
-        self.job_data["Soft Skills"] = self.job_data["Soft Skills"].apply(ast.literal_eval)
-        self.job_data['Hard Skills'] = self.job_data['Hard Skills'].apply(self.preprocess_skills)
-        self.job_data['Soft Skills'] = self.job_data['Soft Skills'].apply(self.preprocess_skills)
-    
-    def preprocess_skills(self, skills):
-        return [skill.lower().strip() for skill in skills if isinstance(skill, str) and skill.strip()]
+        # Load precomputed job embeddings (built on first use for this catalogue)
+        self.skill_cache = ModelRegistry.get_skill_cache(MODEL_NAME)
+        # Job skills are scored from the index, so job_data is only read, never modified
+        self.job_index = JobEmbeddingIndex.for_catalogue(self.job_data, self.model, job_index, skill_cache = self.skill_cache)
     
-    def embed_skills(self, skills):
-        if not skills or not any(skills):
-            return np.zeros(self.model.get_sentence_embedding_dimension())
+    @classmethod
+    def encode_students(cls, model, students, skill_cache = None):
+        """
+        Encodes the skills and degree fields of a DataFrame of student profiles with
+        one encode call per field (skills go through skill_cache when given). Each
+        student's skills are mean-pooled; students without skills get a zero vector.
+        """
+        dim = model.get_sentence_embedding_dimension()
+        vectors = {}
+        for field, column in (("hard_skills", "Hard Skills"), ("soft_skills", "Soft Skills")):
+            skill_lists = [skills if isinstance(skills, list) else [] for skills in students[column]]
+            vocabulary = sorted({skill for skills in skill_lists for skill in skills})
+            if skill_cache is not None:
+                skill_vectors = skill_cache.encode(vocabulary)
+            else:
+                skill_vectors = model.encode(vocabulary, convert_to_numpy = True) if vocabulary else np.zeros((0, dim))
+            skill_ids = {skill: i for i, skill in enumerate(vocabulary)}
 
-        embeddings = self.model.encode(skills, convert_to_numpy = True)
-        return np.mean(embeddings, axis = 0)
-    
-    # Cosine similarity between two skill lists
-    def skill_cosine_similarity(self, job_skills, student_skills):
-        if not job_skills or not student_skills:
-            return 0.0  # One empty - no similarity
-        
-        job_embed = self.embed_skills(job_skills)
-        student_embed = self.embed_skills(student_skills)
-        cosine_sim = cosine_similarity([job_embed], [student_embed])[0][0]
-        return cosine_sim
-    
-    # Cosine Similarity between Student's Degree Field vs Required Degree Field
-    def degree_field_semantic_similarity(self, job_field, student_field):
-        embeddings = self.model.encode([job_field, student_field])
-        return cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-
-    def map_education_level(self, level):
-        mapping = {
-            "High School": 1,
-            "Diploma": 2,
-            "Polytechnic": 2,
-            "Bachelor": 3,
-            "Master": 4,
-            "PhD": 5
-        }
-        return mapping.get(level, 0)
+            pooled = np.zeros((len(skill_lists), dim), dtype = np.float32)
+            for i, skills in enumerate(skill_lists):
+                if skills:
+                    pooled[i] = skill_vectors[[skill_ids[skill] for skill in skills]].mean(axis = 0)
+            vectors[field] = pooled
+
+        degree_fields = students['Degree Field'].fillna("").astype(str).tolist()
+        vectors["degree_field"] = model.encode(degree_fields, convert_to_numpy = True).astype(np.float32)
+        return vectors
 
-    def experience_score(self, student_exp, job_exp):
+    def student_vectors(self):
+        """
+        Encodes the student's skills and degree field once per request.
+        """
+        if not hasattr(self, "_student_vectors"):
+            self._student_vectors = self.encode_students(self.model, pd.DataFrame([self.student]), self.skill_cache)
+        return self._student_vectors
+
+    @classmethod
+    def map_education_level(cls, level):
+        return cls.EDUCATION_LEVELS.get(level, 0)
+
+    @staticmethod
+    def experience_score(student_exp, job_exp):
         diff = student_exp - job_exp
-        return 1 / (1 + math.exp(-0.5 * diff))
+        return 1 / (1 + np.exp(-0.5 * diff))
 
-    def compute_job_score(self, job):
-        student = self.student
+    @classmethod
+    def score_matrix(cls, students, student_vectors, job_data, job_index, skill_scoring = "mean", skill_cache = None):
+        """
+        Scores every student against every job. Returns a dict of students x jobs
+        arrays, one per score component plus the weighted total. With skill_scoring
+        "coverage" the skill scores are SkillCoverage's per-required-skill coverage.
+        """
+        with get_metrics().span("score", n_students = len(students), n_jobs = len(job_data), skill_scoring = skill_scoring):
+            return cls._score_matrix(students, student_vectors, job_data, job_index, skill_scoring, skill_cache)
 
-        education_score = 1 if self.map_education_level(student['Education Level']) >= self.map_education_level(job['Required Education']) else 0
-        degree_score = self.degree_field_semantic_similarity(job['Required Degree Field'], student['Degree Field'])
-        exp_score = self.experience_score(student['Work Experience'], job['Years of Experience'])
-        hard_skill_score = self.skill_cosine_similarity(job['Hard Skills'], student['Hard Skills'])
-        soft_skill_score = self.skill_cosine_similarity(job['Soft Skills'], student['Soft Skills'])
+    @classmethod
+    def _score_matrix(cls, students, student_vectors, job_data, job_index, skill_scoring, skill_cache):
+        student_levels = students['Education Level'].map(cls.EDUCATION_LEVELS).fillna(0).to_numpy()
+        student_experience = pd.to_numeric(students['Work Experience'], errors = "coerce").fillna(0).to_numpy(dtype = np.float64)
+        if "Education Rank" in job_data:
+            # Compiled catalogue (JobCatalogue): the ranks are already stored
+            job_levels = job_data["Education Rank"].to_numpy()
+        else:
+            job_levels = job_data['Required Education'].map(cls.EDUCATION_LEVELS).fillna(0).to_numpy()
+        job_experience = job_data['Years of Experience'].to_numpy(dtype = np.float64)
+
+        education_score = (student_levels[:, None] >= job_levels[None, :]).astype(int)
+        # Job vectors are scored in their stored (possibly float16/int8) form
+        degree_score = job_index.degree_field.cosine(student_vectors['degree_field'])
+        exp_score = cls.experience_score(student_experience[:, None], job_experience[None, :])
+        if skill_scoring == "coverage":
+            coverage = SkillCoverage(job_index, skill_cache)
+            hard_skill_score = coverage.coverage_matrix(students['Hard Skills'], "hard")
+            soft_skill_score = coverage.coverage_matrix(students['Soft Skills'], "soft")
+        else:
+            hard_skill_score = job_index.hard_skills.cosine(student_vectors['hard_skills'])
+            soft_skill_score = job_index.soft_skills.cosine(student_vectors['soft_skills'])
 
         total_score = (
             0.15 * education_score +
@@ -74,42 +114,160 @@ class RecommendationProcessor:
             0.30 * hard_skill_score +
             0.15 * soft_skill_score
         )
-        result = [
-            {
-            "Job Title": job["Job Title"],
-            "Total Score": round(total_score, 3),
+        return {
+            "Total Score": total_score,
             "Education Score": education_score,
-            "Degree Score": round(degree_score, 3),
-            "Experience Score": round(exp_score, 3),
-            "Hard Skill Score": round(hard_skill_score, 3),
-            "Soft Skill Score": round(soft_skill_score, 3)
-        }]
+            "Degree Score": degree_score,
+            "Experience Score": exp_score,
+            "Hard Skill Score": hard_skill_score,
+            "Soft Skill Score": soft_skill_score
+        }
+
+    @staticmethod
+    def top_k_indices(scores, k):
+        """
+        Indices of the k highest scores, best first, without sorting every job.
+        """
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.array([], dtype = int)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind = "stable")]
+
+    @staticmethod
+    def top_jobs_frame(job_data, scores, top):
+        """
+        Builds the recommendation table for one student from their row of scores.
+        """
+        top_df = pd.DataFrame({"Job Title": job_data["Job Title"].to_numpy()[top]}, index = top)
+        for column, values in scores.items():
+            top_df[column] = values[top] if column == "Education Score" else np.round(values[top], 3)
+        return top_df
+
+    @staticmethod
+    def add_skill_matches(top_df, student, job_index, skill_cache = None):
+        """
+        Adds a "Skill Matches" column listing, for each recommended job, every
+        required hard skill with the student skill that best covers it.
+        """
+        coverage = SkillCoverage(job_index, skill_cache)
+        # The student x vocabulary similarities are shared by every job's explanation
+        similarity = coverage.student_similarity([student['Hard Skills']])
+        top_df["Skill Matches"] = [
+            coverage.explain(student['Hard Skills'], position, "hard", similarity) for position in top_df.index
+        ]
+        return top_df
+
+    def compute_job_scores(self):
+        """
+        Scores every job against the student as a handful of matrix-vector operations.
+        """
+        students = pd.DataFrame([self.student])
+        scores = self.score_matrix(students, self.student_vectors(), self.job_data, self.job_index, self.skill_scoring, self.skill_cache)
+        return {column: values[0] for column, values in scores.items()}
 
-        return pd.DataFrame(result)
-    
     def recommend_top_jobs(self, top_n = 5):
-        df = pd.DataFrame(columns=[
-        "Job Title",
-        "Total Score",
-        "Education Score",
-        "Degree Score",
-        "Experience Score",
-        "Hard Skill Score",
-        "Soft Skill Score"
-        ])
-        for _, job in self.job_data.iterrows():
-            score = self.compute_job_score(job)
-            df = pd.concat([df, score], ignore_index=True)
-
-        sorted_df = df.sort_values(by="Total Score", ascending=False)
+        scores = self.compute_job_scores()
+        top_df = self.top_jobs_frame(self.job_data, scores, self.top_k_indices(scores["Total Score"], top_n))
+        if self.skill_scoring == "coverage":
+            self.add_skill_matches(top_df, self.student, self.job_index, self.skill_cache)
 
         # Display top 5 jobs
         print(f"\nTop {top_n} Recommended Jobs for {self.student['Name']}:\n")
-        for _, row in sorted_df.head(top_n).iterrows():
+        for _, row in top_df.iterrows():
+            print(f"{row['Job Title']}: {row['Total Score']:.3f}")
+        return top_df
+
+    @classmethod
+    def rerank(cls, students, student_vectors, job_data, job_index, candidates, top_n, skill_scoring = "mean", skill_cache = None):
+        """
+        Second stage: applies the full weighted score to one student's candidate jobs
+        only. Returns the top n as a table indexed by position in job_data.
+        """
+        scores = cls.score_matrix(
+            students, student_vectors, job_data.iloc[candidates], job_index.take(candidates), skill_scoring, skill_cache
+        )
+        row_scores = {column: values[0] for column, values in scores.items()}
+        top = cls.top_k_indices(row_scores["Total Score"], top_n)
+        top_df = cls.top_jobs_frame(job_data.iloc[candidates], row_scores, top)
+        top_df.index = candidates[top]
+        return top_df
+
+    def recommend_two_stage(self, top_n = 5, n_candidates = DEFAULT_CANDIDATES, search_index = None):
+        """
+        Retrieve-then-rerank: a single profile-embedding cosine against every job
+        retrieves the n_candidates closest jobs, and only those are rescored with
+        the weighted education/degree/experience/hard/soft score. A larger
+        n_candidates trades latency for agreement with recommend_top_jobs.
+        """
+        search_index = search_index or get_search_index(self.job_index)
+
+        # Stage 1: cheap retrieval on the profile embeddings
+        profile_vector = self.model.encode([student_profile_text(self.student)], convert_to_numpy = True)
+        with get_metrics().span("retrieve", n_jobs = len(self.job_data), n_candidates = n_candidates):
+            candidates, _ = search_index.search(profile_vector, max(n_candidates, top_n))
+        candidates = candidates[0][candidates[0] >= 0]
+
+        # Stage 2: full scoring of the candidates only
+        top_df = self.rerank(
+            pd.DataFrame([self.student]), self.student_vectors(), self.job_data, self.job_index, candidates, top_n,
+            self.skill_scoring, self.skill_cache
+        )
+        if self.skill_scoring == "coverage":
+            self.add_skill_matches(top_df, self.student, self.job_index, self.skill_cache)
+
+        print(f"\nTop {top_n} Recommended Jobs for {self.student['Name']} (reranked from {len(candidates)} candidates):\n")
+        for _, row in top_df.iterrows():
             print(f"{row['Job Title']}: {row['Total Score']:.3f}")
-        return sorted_df.head(top_n)
+        return top_df
+
+    @classmethod
+    def recommend_batch(cls, students, job_data, top_n = 5, job_index = None, chunk_size = None, n_candidates = None, skill_scoring = "mean"):
+        """
+        Recommends the top n jobs for every student in a DataFrame of profiles (as
+        returned by StudentInfoExtractor.extract_all_info). Student fields are encoded
+        in a few batched calls and scored as students x jobs matrices, chunk_size
+        students at a time to bound memory. Returns one table per student, in order.
+
+        With n_candidates set, every student's profile embedding first retrieves
+        their n_candidates closest jobs and only those are given the full score.
+        """
+        model = ModelRegistry.get_sentence_model(MODEL_NAME)
+        skill_cache = ModelRegistry.get_skill_cache(MODEL_NAME)
+        job_index = JobEmbeddingIndex.for_catalogue(job_data, model, job_index, skill_cache = skill_cache)
+
+        students = students.reset_index(drop = True)
+        student_vectors = cls.encode_students(model, students, skill_cache)
+
+        recommendations = []
+        if n_candidates is not None:
+            search_index = get_search_index(job_index)
+            profile_vectors = model.encode([student_profile_text(student) for _, student in students.iterrows()], convert_to_numpy = True)
+            for chunk in student_chunks(len(students), len(job_data), chunk_size):
+                with get_metrics().span("retrieve", n_jobs = len(job_data), n_candidates = n_candidates):
+                    candidates, _ = search_index.search(profile_vectors[chunk], max(n_candidates, top_n))
+                for i, row in zip(range(len(students))[chunk], candidates):
+                    row_vectors = {field: vectors[[i]] for field, vectors in student_vectors.items()}
+                    recommendations.append(cls.rerank(
+                        students.iloc[[i]], row_vectors, job_data, job_index, row[row >= 0], top_n, skill_scoring, skill_cache
+                    ))
+        else:
+            for chunk in student_chunks(len(students), len(job_data), chunk_size):
+                chunk_vectors = {field: vectors[chunk] for field, vectors in student_vectors.items()}
+                scores = cls.score_matrix(students.iloc[chunk], chunk_vectors, job_data, job_index, skill_scoring, skill_cache)
+                for i in range(len(scores["Total Score"])):
+                    row_scores = {column: values[i] for column, values in scores.items()}
+                    top = cls.top_k_indices(row_scores["Total Score"], top_n)
+                    recommendations.append(cls.top_jobs_frame(job_data, row_scores, top))
+
+        if skill_scoring == "coverage":
+            for (_, student), top_df in zip(students.iterrows(), recommendations):
+                cls.add_skill_matches(top_df, student, job_index, skill_cache)
+        return recommendations
+
     
-    def generate_recommendation_row(self, student_name, top_jobs):
+    @staticmethod
+    def generate_recommendation_row(student_name, top_jobs):
         titles = top_jobs['Job Title'].tolist()
         return {
             "name": student_name,
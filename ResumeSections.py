@@ -0,0 +1,84 @@
+import re
+
+HEADER = "Header"
+# Section headings, checked in order: a heading naming several sections (e.g.
+# "ACADEMIC PROJECT", "INTERNSHIP EXPERIENCE") belongs to the first one it matches.
+# Activities come before Experience so "LEADERSHIP EXPERIENCE" or "CCA EXPERIENCE"
+# are not counted as work experience
+SECTION_KEYWORDS = [
+    ("Projects", r"projects?"),
+    ("Activities", r"activities|co-curricular|extracurricular|ccas?|leadership|volunteer(?:ing)?|community service"),
+    ("Experience", r"experiences?|employment|internships?|work history|career history"),
+    ("Education", r"education|academic|qualifications?"),
+    ("Skills", r"skills?|skill sets?|competenc(?:y|ies)|proficienc(?:y|ies)"),
+    ("Awards", r"awards?|achievements?|certifications?"),
+    ("Profile", r"profile|summary|objective|about me"),
+    ("Interests", r"interests?|hobbies"),
+]
+MAX_HEADING_WORDS = 5
+MAX_HEADING_CHARS = 45
+# Words that may stay lowercase in a title-case heading ("Skills and Interests")
+MINOR_WORDS = {"and", "of", "&", "/", "-", "–"}
+
+
+class ResumeSections:
+    """
+    Line ranges of the resume's sections (Education, Experience, Projects, Skills,
+    ...), found in one pass over the lines. A line is a heading if it is short,
+    has no digits or list punctuation, is upper- or title-case and names a section
+    in SECTION_KEYWORDS. Lines before the first heading are the HEADER section.
+
+    A section may occur more than once (e.g. "WORK EXPERIENCE" and "INTERNSHIP
+    EXPERIENCE"); lines(name) returns all of them in resume order.
+    """
+    _patterns = [(name, re.compile(rf"\b(?:{keywords})\b", re.IGNORECASE)) for name, keywords in SECTION_KEYWORDS]
+
+    def __init__(self, lines):
+        self.all_lines = lines
+        self.ranges = []    # (section, first line, end line)
+        section, start = HEADER, 0
+        for number, line in enumerate(lines):
+            heading = self.heading(line)
+            if heading:
+                self.ranges.append((section, start, number))
+                section, start = heading, number + 1
+        self.ranges.append((section, start, len(lines)))
+        self.ranges = [(section, start, end) for section, start, end in self.ranges if end > start]
+
+    @classmethod
+    def heading(cls, line):
+        """
+        The section a line is the heading of, or None.
+        """
+        line = line.strip().rstrip(":").strip()
+        if not line or len(line) > MAX_HEADING_CHARS or not line[0].isalpha() or re.search(r"[\d,|•●]", line):
+            return None
+        words = line.split()
+        if len(words) > MAX_HEADING_WORDS:
+            return None
+        if not line.isupper() and not all(word[0].isupper() or word.lower() in MINOR_WORDS for word in words):
+            return None
+        for name, pattern in cls._patterns:
+            if pattern.search(line):
+                return name
+        return None
+
+    def __contains__(self, name):
+        return any(section == name for section, _, _ in self.ranges)
+
+    def names(self):
+        return [section for section, _, _ in self.ranges]
+
+    def lines(self, *names):
+        """
+        Lines of the named sections, in resume order.
+        """
+        return [line for section, start, end in self.ranges if section in names for line in self.all_lines[start:end]]
+
+    def text(self, *names, default = None):
+        """
+        Text of the named sections, or default if the resume has none of them.
+        """
+        if not any(name in self for name in names):
+            return default
+        return "\n".join(self.lines(*names))
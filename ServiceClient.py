@@ -0,0 +1,52 @@
+import pandas as pd
+import requests
+from RecommendationProcessor import DEFAULT_CANDIDATES
+
+
+class ServiceClient:
+    """
+    Client for the recommendation service (service.py), used by the Streamlit app
+    when RECOMMENDER_API_URL is set so the UI process loads no models.
+    """
+
+    def __init__(self, base_url, timeout = 120):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path, **kwargs):
+        response = self.session.post(f"{self.base_url}{path}", timeout = self.timeout, **kwargs)
+        if response.status_code >= 400:
+            detail = response.json().get("detail", response.text) if response.headers.get("content-type", "").startswith("application/json") else response.text
+            raise RuntimeError(f"{path} failed ({response.status_code}): {detail}")
+        return response.json()
+
+    def extract(self, data, filename = "resume.pdf"):
+        """
+        Extracted student profile (dict) for the bytes of a resume PDF.
+        """
+        return self._post("/extract", files = {"file": (filename, data, "application/pdf")})["profile"]
+
+    def recommend(self, profile, top_k = 5, algorithm = "Semantic", n_candidates = DEFAULT_CANDIDATES, skill_scoring = "mean", save = True):
+        """
+        Recommendation table for one extracted profile, as main() returns it.
+        """
+        body = {
+            "profile": profile, "top_k": top_k, "algorithm": algorithm,
+            "n_candidates": n_candidates, "skill_scoring": skill_scoring, "save": save
+        }
+        return pd.DataFrame(self._post("/recommend", json = body)["recommendations"])
+
+    def save(self, profile, recommended_jobs):
+        """
+        Saves a profile and the recommendation table already returned for it.
+        """
+        body = {"profile": profile, "job_titles": recommended_jobs["Job Title"].tolist()}
+        return self._post("/save", json = body)
+
+    def recommend_batch(self, profiles, top_k = 5, algorithm = "Semantic", n_candidates = DEFAULT_CANDIDATES, skill_scoring = "mean", save = True):
+        body = {
+            "profiles": profiles, "top_k": top_k, "algorithm": algorithm,
+            "n_candidates": n_candidates, "skill_scoring": skill_scoring, "save": save
+        }
+        return [pd.DataFrame(jobs) for jobs in self._post("/recommend/batch", json = body)["recommendations"]]
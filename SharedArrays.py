@@ -0,0 +1,69 @@
+import os
+import uuid
+import shutil
+import numpy as np
+
+
+def publish_directory(path, write, replace = False):
+    """
+    Writes a directory of files atomically: write(tmp_path) fills a temporary
+    sibling directory, which is then renamed to path. Worker processes therefore
+    never see a half-written index. If path already exists it is kept (another
+    process published the same content first) unless replace is set.
+
+    With replace, path is a symlink to a versioned sibling directory
+    (.name.v-xxxxxxxx) and a new version is published by swapping the symlink
+    with os.replace, so path always names a complete directory. The previous
+    version is kept for readers that resolved the link just before the swap;
+    older ones are deleted.
+    """
+    parent = os.path.dirname(path) or "."
+    os.makedirs(parent, exist_ok = True)
+    name = os.path.basename(path)
+    tmp_path = os.path.join(parent, f".{name}.tmp-{uuid.uuid4().hex[:8]}")
+    os.makedirs(tmp_path)
+    try:
+        write(tmp_path)
+        if replace:
+            version = f".{name}.v-{uuid.uuid4().hex[:8]}"
+            os.rename(tmp_path, os.path.join(parent, version))
+            previous = os.readlink(path) if os.path.islink(path) else None
+            if previous is None and os.path.isdir(path):
+                # A directory published before versioning: moved aside once
+                previous = f".{name}.v-{uuid.uuid4().hex[:8]}"
+                os.rename(path, os.path.join(parent, previous))
+            link = os.path.join(parent, f".{name}.link-{uuid.uuid4().hex[:8]}")
+            os.symlink(version, link)
+            os.replace(link, path)
+            prune_versions(parent, name, keep = {version, previous})
+            return path
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors = True)
+    return path
+
+
+def prune_versions(parent, name, keep):
+    """
+    Deletes the versions of parent/name not named in keep.
+    """
+    for entry in os.listdir(parent):
+        if entry.startswith(f".{name}.v-") and entry not in keep:
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors = True)
+
+
+def shared_array(path, compute):
+    """
+    Array stored at path, memory-mapped read-only. The first process to need it
+    computes and saves it; every other process maps the same file, so the pages
+    are shared through the OS page cache instead of copied per process.
+    """
+    if not os.path.exists(path):
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}.npy"
+        np.save(tmp_path, compute())
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode = "r")
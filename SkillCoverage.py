@@ -0,0 +1,95 @@
+import numpy as np
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobCatalogue import parse_skills
+from JobEmbeddingIndex import unit_rows
+
+
+class SkillCoverage:
+    """
+    Skill-level matching against the global skill matrix stored in a JobEmbeddingIndex.
+
+    Instead of comparing mean-pooled skill lists, every student skill is compared
+    with every catalogue skill in one (student skills x vocabulary) matrix product.
+    A job's coverage is the mean, over its required skills, of the best similarity
+    any of the student's skills reaches for that skill (negative similarities count
+    as 0). Jobs without required skills, or students without skills, score 0.
+    """
+    KINDS = ("hard", "soft")
+
+    def __init__(self, job_index, skill_cache = None):
+        self.job_index = job_index
+        self.skill_cache = skill_cache or ModelRegistry.get_skill_cache(MODEL_NAME)
+
+    def job_skills(self, kind):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown skill kind: {kind}")
+        return getattr(self.job_index, f"{kind}_skill_ids"), getattr(self.job_index, f"{kind}_skill_offsets")
+
+    def student_similarity(self, skill_lists):
+        """
+        Returns (best, best_skill): students x vocabulary arrays with the highest
+        similarity any of the student's skills reaches for each catalogue skill, and
+        the index of that skill in the student's list (-1 if the student has none).
+        """
+        skill_lists = [parse_skills(skills) if isinstance(skills, (list, str)) else [] for skills in skill_lists]
+        n_vocab = len(self.job_index.skill_vectors)
+        best = np.zeros((len(skill_lists), n_vocab), dtype = np.float32)
+        best_skill = np.full((len(skill_lists), n_vocab), -1, dtype = np.int32)
+
+        rows = [skill for skills in skill_lists for skill in skills]
+        if not rows or not n_vocab:
+            return best, best_skill
+
+        # One GEMM for every student skill against the whole vocabulary
+        distinct = {skill: i for i, skill in enumerate(dict.fromkeys(rows))}
+        similarity = unit_rows(self.skill_cache.encode(list(distinct))) @ np.asarray(self.job_index.skill_vectors).T
+        similarity = similarity[[distinct[skill] for skill in rows]]
+
+        start = 0
+        for i, skills in enumerate(skill_lists):
+            if skills:
+                block = similarity[start:start + len(skills)]
+                best_skill[i] = block.argmax(axis = 0)
+                best[i] = np.maximum(block.max(axis = 0), 0)
+            start += len(skills)
+        return best, best_skill
+
+    def coverage_matrix(self, skill_lists, kind = "hard"):
+        """
+        Students x jobs coverage of each job's required skills of the given kind.
+        """
+        best, _ = self.student_similarity(skill_lists)
+        return self.coverage_from_best(best, kind)
+
+    def coverage_from_best(self, best, kind = "hard"):
+        ids, offsets = self.job_skills(kind)
+        ids, offsets = np.asarray(ids), np.asarray(offsets)
+        counts = np.diff(offsets)
+        coverage = np.zeros((len(best), len(counts)), dtype = np.float32)
+        required = counts > 0
+        if best.size and required.any():
+            # Sum the gathered similarities over each job's CSR segment; empty
+            # segments are skipped so reduceat never sees a zero-length slice
+            totals = np.add.reduceat(best[:, ids], offsets[:-1][required], axis = 1)
+            coverage[:, required] = totals / counts[required]
+        return coverage
+
+    def explain(self, student_skills, job_position, kind = "hard", similarity = None):
+        """
+        Per required skill of one job: (required skill, best matching student skill
+        or None, similarity), best matched first. Pass the student's
+        student_similarity([student_skills]) as similarity when explaining several
+        jobs, so it is computed once.
+        """
+        student_skills = parse_skills(student_skills) if isinstance(student_skills, (list, str)) else []
+        best, best_skill = similarity if similarity is not None else self.student_similarity([student_skills])
+        ids, offsets = self.job_skills(kind)
+        matches = []
+        for skill_id in ids[offsets[job_position]:offsets[job_position + 1]]:
+            matched = best_skill[0, skill_id]
+            matches.append((
+                self.job_index.skill_vocab[skill_id],
+                student_skills[matched] if matched >= 0 else None,
+                round(float(best[0, skill_id]), 3)
+            ))
+        return sorted(matches, key = lambda match: -match[2])
@@ -1,21 +1,91 @@
 import pandas as pd
 import numpy as np
-import spacy
-import ast
 from dateutil import parser
 import re
-from spacy.matcher import Matcher
-from rapidfuzz import fuzz, process
+import time
+import argparse
 from spacy.matcher import PhraseMatcher
-from skillNer.general_params import SKILL_DB
-from skillNer.skill_extractor_class import SkillExtractor
+from ModelRegistry import ModelRegistry, SPACY_MODEL
+from ResumeSections import ResumeSections, HEADER
+from Metrics import get_metrics
+
+class SoftSkillMatcher:
+    """
+    Soft-skill PhraseMatcher and unit-normalized skill vector matrix, compiled once
+    per spaCy pipeline (see ModelRegistry.get_soft_skill_matcher).
+    """
+    def __init__(self, nlp, skills):
+        self.skills = list(skills)
+        self.matcher = PhraseMatcher(nlp.vocab, attr = "LOWER")
+        self.matcher.add("SOFT_SKILLS", [nlp.make_doc(skill) for skill in self.skills])
+
+        # Doc vectors are averages of static token vectors, so tokenizing is enough
+        skill_docs = [nlp.make_doc(skill) for skill in self.skills]
+        vectors = np.array([skill_doc.vector for skill_doc in skill_docs], dtype = np.float32)
+        norms = np.linalg.norm(vectors, axis = 1)
+        self.has_vector = np.array([skill_doc.has_vector for skill_doc in skill_docs]) & (norms > 0)
+        self.unit_vectors = np.divide(vectors, norms[:, None], out = np.zeros_like(vectors), where = norms[:, None] > 0)
+
+    def similar_skills(self, doc, similarity_threshold):
+        """
+        Skills whose vector similarity to the document (as Doc.similarity) meets the threshold.
+        """
+        if not doc.has_vector or doc.vector_norm == 0:
+            return []
+        similarities = self.unit_vectors @ (np.asarray(doc.vector, dtype = np.float32) / doc.vector_norm)
+        selected = self.has_vector & (similarities >= similarity_threshold)
+        return [skill for skill, keep in zip(self.skills, selected) if keep]
 
 class StudentInfoExtractor:
     def __init__(self, text):
-        self.nlp = spacy.load("en_core_web_lg")
-        self.skill_extractor = SkillExtractor(self.nlp, SKILL_DB, PhraseMatcher)
-        self.soft_skills_list = self.load_soft_skills_list()
+        self.nlp = ModelRegistry.get_nlp()
+        self.skill_extractor = ModelRegistry.get_skill_extractor()
+        self.soft_skill_matcher = ModelRegistry.get_soft_skill_matcher()
+        self.university_index = ModelRegistry.get_university_index()
+        self.soft_skills_list = self.soft_skill_matcher.skills
         self.text = text
+        self.timings = {}
+        self._doc = None
+        self._lines = None
+        self._sections = None
+
+    @property
+    def doc(self):
+        """
+        The resume tokenized once and shared by the spaCy-based stages. Phrase
+        matching on LOWER and static-vector similarity only need the tokenizer.
+        """
+        if self._doc is None:
+            start = time.perf_counter()
+            self._doc = self.nlp.make_doc(self.text)
+            self.timings['spaCy Parse'] = time.perf_counter() - start
+            get_metrics().record("extract.spaCy Parse", self.timings['spaCy Parse'])
+        return self._doc
+
+    def doc_of(self, text):
+        return self.doc if text is self.text else self.nlp.make_doc(text)
+
+    def lines_of(self, text):
+        # Split the resume into lines once and reuse it across stages
+        if text is self.text:
+            if self._lines is None:
+                self._lines = text.splitlines()
+            return self._lines
+        return text.splitlines()
+
+    def sections_of(self, text):
+        """
+        Section index of the resume (see ResumeSections), built once in a single
+        pass over its lines. Each extractor searches only its own sections.
+        """
+        if text is self.text:
+            if self._sections is None:
+                start = time.perf_counter()
+                self._sections = ResumeSections(self.lines_of(text))
+                self.timings['Sections'] = time.perf_counter() - start
+                get_metrics().record("extract.Sections", self.timings['Sections'])
+            return self._sections
+        return ResumeSections(self.lines_of(text))
     
     # Rule-based Heuristics: Assumes that the name is in the first line, contains at least 2 words, and it starts with a captial letter
     def extract_name_from_top_line(self, text):
@@ -31,26 +101,28 @@ class StudentInfoExtractor:
 
         return None
     
-    # Regular Expression
+    # Regular Expression, over the lines above the first section heading first
     def extract_emails(self, text):
         pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[A-Za-z]{2,}"
-        matches = re.findall(pattern, text)
+        header = self.sections_of(text).text(HEADER, default = "")
+        matches = re.findall(pattern, header) or re.findall(pattern, text)
         return matches if matches else None
     
-    # Regular Expressions
+    # Regular Expressions, over the lines above the first section heading first
     def extract_contact_information(self, text):
         contact_number = None
 
         # Updated pattern to match international numbers with + sign and spacing
         pattern = r'(?:\+?\d{1,3}[-.\s]?)?(?:\d{3,4}[-.\s]?){2,3}\d{2,4}'
 
-        match = re.search(pattern, text)
+        header = self.sections_of(text).text(HEADER, default = "")
+        match = re.search(pattern, header) or re.search(pattern, text)
         if match:
             contact_number = match.group().strip()
         return contact_number
     
     def capture_education_level(self, text):
-        text = text.lower()
+        text = self.sections_of(text).text("Education", default = text).lower()
 
         if "phd" in text or "doctor of philosophy" in text:
             return "PhD"
@@ -69,6 +141,7 @@ class StudentInfoExtractor:
         
     def capture_degree_field(self, text):
         pattern = r'(?:Bachelor|Master|PhD|Bachelors|Bachelor\'s|Master\'s|Diploma|Polytechnic|Higher Diploma|Advanced Diploma)[^.\n]*? in ([A-Za-z &\-\/]+)'
+        text = self.sections_of(text).text("Education", default = text)
 
         match = re.search(pattern, text, re.IGNORECASE)
         if match:
@@ -77,313 +150,13 @@ class StudentInfoExtractor:
 
         return None
     
+    # Fuzzy matching against the prebuilt university index (see universities.txt)
     def capture_university_name(self, text):
-        top_290_universities = [
-        "Massachusetts Institute of Technology (MIT)",
-        "Imperial College London",
-        "University of Oxford",
-        "Harvard University",
-        "University of Cambridge",
-        "Stanford University",
-        "ETH Zurich – Swiss Federal Institute of Technology",
-        "National University of Singapore (NUS)",
-        "University College London (UCL)",
-        "California Institute of Technology (Caltech)",
-        "University of Pennsylvania",
-        "University of California, Berkeley (UCB)",
-        "The University of Melbourne",
-        "Peking University",
-        "Nanyang Technological University, Singapore (NTU Singapore)",
-        "Cornell University",
-        "The University of Hong Kong",
-        "The University of Sydney",
-        "The University of New South Wales (UNSW Sydney)",
-        "Tsinghua University",
-        "University of Chicago",
-        "Princeton University",
-        "Yale University",
-        "Université PSL",
-        "University of Toronto",
-        "EPFL – École polytechnique fédérale de Lausanne",
-        "The University of Edinburgh",
-        "Technical University of Munich",
-        "McGill University",
-        "Australian National University (ANU)",
-        "Seoul National University",
-        "Johns Hopkins University",
-        "The University of Tokyo",
-        "Columbia University",
-        "The University of Manchester",
-        "The Chinese University of Hong Kong (CUHK)",
-        "Monash University",
-        "University of British Columbia",
-        "Fudan University",
-        "King's College London",
-        "The University of Queensland",
-        "University of California, Los Angeles (UCLA)",
-        "New York University (NYU)",
-        "University of Michigan-Ann Arbor",
-        "Shanghai Jiao Tong University",
-        "Institut Polytechnique de Paris",
-        "The Hong Kong University of Science and Technology",
-        "Zhejiang University",
-        "Delft University of Technology",
-        "Kyoto University",
-        "Northwestern University",
-        "The London School of Economics and Political Science (LSE)",
-        "KAIST - Korea Advanced Institute of Science & Technology",
-        "University of Bristol",
-        "University of Amsterdam",
-        "Yonsei University",
-        "The Hong Kong Polytechnic University",
-        "Carnegie Mellon University",
-        "Ludwig-Maximilians-Universität München",
-        "Universiti Malaya (UM)",
-        "Duke University",
-        "City University of Hong Kong",
-        "KU Leuven",
-        "Sorbonne University",
-        "The University of Auckland",
-        "University of Texas at Austin",
-        "Korea University",
-        "National Taiwan University (NTU)",
-        "The University of Warwick",
-        "University of Illinois at Urbana-Champaign",
-        "Universidad de Buenos Aires (UBA)",
-        "University of California, San Diego (UCSD)",
-        "Université Paris-Saclay",
-        "KTH Royal Institute of Technology",
-        "Lund University",
-        "University of Washington",
-        "The University of Western Australia",
-        "University of Glasgow",
-        "Brown University",
-        "University of Birmingham",
-        "University of Southampton",
-        "The University of Adelaide",
-        "University of Leeds",
-        "Universität Heidelberg",
-        "Tokyo Institute of Technology (Tokyo Tech)",
-        "Osaka University",
-        "Trinity College Dublin, The University of Dublin",
-        "University of Technology Sydney",
-        "Durham University",
-        "Pennsylvania State University",
-        "Purdue University",
-        "Universidade de São Paulo",
-        "Pontificia Universidad Católica de Chile (UC)",
-        "Lomonosov Moscow State University",
-        "Universidad Nacional Autónoma de México (UNAM)",
-        "University of Alberta",
-        "Freie Universitaet Berlin",
-        "Pohang University of Science And Technology (POSTECH)",
-        "RWTH Aachen University",
-        "University of Copenhagen",
-        "King Fahd University of Petroleum & Minerals (KFUPM)",
-        "Karlsruhe Institute of Technology (KIT)",
-        "Uppsala University",
-        "University of St Andrews",
-        "The University of Sheffield",
-        "Utrecht University",
-        "Tohoku University",
-        "Boston University",
-        "University of Nottingham",
-        "Technical University of Denmark",
-        "University of Zurich",
-        "Politecnico di Milano",
-        "Aalto University",
-        "Georgia Institute of Technology",
-        "University of Waterloo",
-        "University of Wisconsin-Madison",
-        "University of Helsinki",
-        "Indian Institute of Technology Bombay (IITB)",
-        "University of Oslo",
-        "Queen Mary University of London",
-        "Western University",
-        "Qatar University",
-        "RMIT University",
-        "Sungkyunkwan University (SKKU)",
-        "University of Southern California",
-        "Humboldt-Universität zu Berlin",
-        "University College Dublin",
-        "Stockholm University",
-        "Newcastle University",
-        "University of California, Davis",
-        "University of Basel",
-        "Sapienza University of Rome",
-        "Alma Mater Studiorum - Università di Bologna",
-        "Macquarie University",
-        "University of Science and Technology of China",
-        "Eindhoven University of Technology",
-        "University of Vienna",
-        "Universiti Kebangsaan Malaysia (UKM)",
-        "Chalmers University of Technology",
-        "Universidad de Chile",
-        "Lancaster University",
-        "Leiden University",
-        "Rice University",
-        "University of Bern",
-        "University of Groningen",
-        "University of Pittsburgh",
-        "University of Reading",
-        "University of Twente",
-        "University of York",
-        "Vrije Universiteit Amsterdam",
-        "Wageningen University & Research",
-        "Aarhus University",
-        "Arizona State University",
-        "Autonomous University of Barcelona",
-        "Birkbeck, University of London",
-        "Brandeis University",
-        "Case Western Reserve University",
-        "Chiba University",
-        "Colorado State University",
-        "Curtin University",
-        "Dalhousie University",
-        "Deakin University",
-        "Drexel University",
-        "Ecole des Ponts ParisTech",
-        "Ecole Normale Supérieure de Lyon",
-        "Ecole Polytechnique",
-        "Emory University",
-        "Florida State University",
-        "George Washington University",
-        "Ghent University",
-        "Griffith University",
-        "Hanyang University",
-        "Heriot-Watt University",
-        "Hokkaido University",
-        "Indian Institute of Science",
-        "Indian Institute of Technology Delhi (IITD)",
-        "Indian Institute of Technology Kanpur (IITK)",
-        "Indian Institute of Technology Kharagpur (IITKGP)",
-        "Indian Institute of Technology Madras (IITM)",
-        "Indian Institute of Technology Roorkee (IITR)",
-        "Indiana University Bloomington",
-        "Iowa State University",
-        "James Cook University",
-        "Jilin University",
-        "Kobe University",
-        "Kyushu University",
-        "La Trobe University",
-        "Laval University",
-        "Lomonosov Moscow State University",
-        "Louisiana State University",
-        "Lund University",
-        "Mahidol University",
-        "Michigan State University",
-        "Nagoya University",
-        "National Autonomous University of Mexico (UNAM)",
-        "National Cheng Kung University",
-        "National Chiao Tung University",
-        "National Tsing Hua University",
-        "Newcastle University",
-        "North Carolina State University",
-        "Norwegian University of Science and Technology",
-        "Ohio State University",
-        "Oregon State University",
-        "Osaka University",
-        "Peking University",
-        "Pennsylvania State University",
-        "Politecnico di Torino",
-        "Pontificia Universidad Católica de Chile",
-        "Purdue University",
-        "Queen's University",
-        "Rensselaer Polytechnic Institute",
-        "RMIT University",
-        "Rutgers University–New Brunswick",
-        "San Diego State University",
-        "Seoul National University",
-        "Shanghai Jiao Tong University",
-        "Sichuan University",
-        "Simon Fraser University",
-        "Sofia University",
-        "Sogang University",
-        "South China University of Technology",
-        "Southern Methodist University",
-        "Stellenbosch University",
-        "Stony Brook University",
-        "Sungkyunkwan University",
-        "Sun Yat-sen University",
-        "Syracuse University",
-        "Technical University of Munich",
-        "Technion - Israel Institute of Technology",
-        "Technische Universität Berlin",
-        "Technische Universität Dresden",
-        "Texas A&M University",
-        "The Chinese University of Hong Kong",
-        "The Hong Kong Polytechnic University",
-        "The Hong Kong University of Science and Technology",
-        "The University of Adelaide",
-        "The University of Auckland",
-        "The University of Hong Kong",
-        "The University of Melbourne",
-        "The University of New South Wales",
-        "The University of Queensland",
-        "The University of Sydney",
-        "The University of Tokyo",
-        "The University of Western Australia",
-        "Tianjin University",
-        "Tohoku University",
-        "Tokyo Institute of Technology",
-        "Tongji University",
-        "Tsinghua University",
-        "Tufts University",
-        "Tulane University",
-        "UCL (University College London)",
-        "Universidad Autónoma de Madrid",
-        "Universidad de Buenos Aires",
-        "Universidad de Chile",
-        "Universidad Nacional Autónoma de México",
-        "Universidade de São Paulo",
-        "Université de Montréal",
-        "Université Laval",
-        "Université Paris-Saclay",
-        "Université PSL",
-        "University College Dublin",
-        "University of Alberta",
-        "University of Amsterdam",
-        "University of Arizona",
-        "University of Basel",
-        "University of Bath",
-        "University of Bergen",
-        "University of Birmingham",
-        "University of Bristol",
-        "University of British Columbia",
-        "University of Calgary",
-        "University of California, Berkeley",
-        "University of California, Davis",
-        "University of California, Irvine",
-        "University of California, Los Angeles",
-        "University of California, San Diego",
-        "University of California, Santa Barbara",
-        "University of Cambridge",
-        "University of Cape Town",
-        "University of Colorado Boulder",
-        "University of Copenhagen",
-        "University of Edinburgh",
-        "University of Florida",
-        "University of Geneva",
-        "University of Glasgow",
-        "University of Göttingen",
-        "University of Groningen",
-        "University of Helsinki",
-        "University of Hong Kong",
-        ]
-        
-        lines = text.splitlines()
-        best_match = process.extractOne(
-            query=' '.join(lines),
-            choices = top_290_universities,
-            scorer = fuzz.partial_ratio,
-            score_cutoff = 80  # Only return if match is strong enough
-        )
-
-        if best_match:
-            return best_match[0]  # university name
-        return None
+        return self.university_index.match(self.sections_of(text).lines("Education") or self.lines_of(text))
     
     def capture_gpa_or_classification(self, text):
+        text = self.sections_of(text).text("Education", default = text)
+
         # 1. Match GPA (e.g., GPA: 4.5)
         gpa_pattern = r"GPA\s*[:\-]?\s*(\d\.\d{1,2})"
         match = re.search(gpa_pattern, text, re.IGNORECASE)
@@ -410,19 +183,8 @@ class StudentInfoExtractor:
         return None
     
     def extract_work_experience_dates(self, text):
-        # Step 1: Get work experience section only
-        work_section = ""
-        lines = text.splitlines()
-        in_work_section = False
-
-        for line in lines:
-            if "work experience" in line.lower() or "work" in line.lower() or "experience" in line.lower():
-                in_work_section = True
-                continue
-            if in_work_section and (line.strip().lower().startswith("education") or "project" in line.lower()):
-                break
-            if in_work_section:
-                work_section += line + "\n"
+        # Step 1: Get the work experience sections only (none: no experience)
+        work_section = self.sections_of(text).text("Experience", default = "")
 
         # Step 2: Extract date ranges like "Sep 2024 – Jan 2025"
         date_pattern = re.findall(r'([A-Za-z]+\s\d{4})\s*[-–]\s*([A-Za-z]+\s\d{4})', work_section)
@@ -441,6 +203,8 @@ class StudentInfoExtractor:
         total_years = round(total_months / 12, 1)
         return total_years
     
+    # skillNer annotates its own cleaned, lowercased copy of the text, so it cannot
+    # share self.doc; its matcher passes only tokenize (see ModelRegistry.get_skill_extractor)
     def capture_hard_skills(self, text):
         skill_extractor = self.skill_extractor
         annotations = skill_extractor.annotate(text)
@@ -454,7 +218,8 @@ class StudentInfoExtractor:
 
         return hard_skill_list
     
-    def load_soft_skills_list(self):
+    @staticmethod
+    def load_soft_skills_list():
         return [
         "communication", "teamwork", "problem solving", "adaptability", "leadership",
         "creativity", "empathy", "work ethic", "critical thinking", "interpersonal skills",
@@ -513,45 +278,93 @@ class StudentInfoExtractor:
         ]
     
     def capture_soft_skills(self, text, similarity_threshold = 0.7):
-        nlp = self.nlp  # Make sure this model is installed!
-        matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-        patterns = [self.nlp.make_doc(skill) for skill in self.soft_skills_list]
-        matcher.add("SOFT_SKILLS", patterns)
+        soft_skill_matcher = self.soft_skill_matcher
 
-        doc = nlp(text)
+        doc = self.doc_of(text)
 
         # --- Phrase Matching ---
         matched_skills = set()
-        matches = matcher(doc)
+        matches = soft_skill_matcher.matcher(doc)
         for match_id, start, end in matches:
             span = doc[start:end]
             matched_skills.add(span.text.lower())
 
         # --- Vector Similarity Matching ---
-        for skill in self.soft_skills_list:
-            skill_doc = nlp(skill)
-            # Check if both documents have vectors
-            if doc.has_vector and skill_doc.has_vector:
-                similarity = doc.similarity(skill_doc)
-                if similarity >= similarity_threshold:
-                    matched_skills.add(skill.lower())
+        # One matrix-vector product against the precomputed soft-skill vectors
+        for skill in soft_skill_matcher.similar_skills(doc, similarity_threshold):
+            matched_skills.add(skill.lower())
 
         return sorted(matched_skills)
     
     def extract_all_info(self):
+        stages = [
+            ('Name', lambda: self.extract_name_from_top_line(self.text) or ''),
+            ('Email', lambda: self.extract_emails(self.text) or []),
+            ('Contact Information', lambda: self.extract_contact_information(self.text) or ''),
+            ('Education Level', lambda: self.capture_education_level(self.text) or ''),
+            ('Degree Field', lambda: self.capture_degree_field(self.text) or ''),
+            ('University', lambda: self.capture_university_name(self.text) or ''),
+            ('GPA', lambda: self.capture_gpa_or_classification(self.text) or ''),
+            ('Work Experience', lambda: self.extract_work_experience_dates(self.text) or 0),
+            ('Hard Skills', lambda: self.capture_hard_skills(self.text) or []),
+            ('Soft Skills', lambda: self.capture_soft_skills(self.text) or [])
+        ]
+        metrics = get_metrics()
         try:
-            return pd.DataFrame([{
-                'Name': self.extract_name_from_top_line(self.text) or '',
-                'Email': self.extract_emails(self.text) or [],
-                'Contact Information': self.extract_contact_information(self.text) or '',
-                'Education Level': self.capture_education_level(self.text) or '',
-                'Degree Field': self.capture_degree_field(self.text) or '',
-                'University': self.capture_university_name(self.text) or '',
-                'GPA': self.capture_gpa_or_classification(self.text) or '',
-                'Work Experience': self.extract_work_experience_dates(self.text) or 0,
-                'Hard Skills': self.capture_hard_skills(self.text) or [],
-                'Soft Skills': self.capture_soft_skills(self.text) or []
-            }])
+            with metrics.span("extract_all_info", characters = len(self.text)):
+                self.doc  # tokenize once up front so it is timed on its own
+                self.sections_of(self.text)  # likewise for the section index
+                info = {}
+                for column, stage in stages:
+                    start = time.perf_counter()
+                    info[column] = stage()
+                    self.timings[column] = time.perf_counter() - start
+                    metrics.record(f"extract.{column}", self.timings[column])
+            return pd.DataFrame([info])
         except Exception as e:
             print(f"[ERROR] Failed to extract info: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
+
+    def timing_breakdown(self):
+        """
+        Per-stage extraction times in milliseconds from the last extract_all_info call.
+        """
+        return {stage: round(seconds * 1000, 2) for stage, seconds in self.timings.items()}
+
+
+def hard_skill_parity(texts, name = SPACY_MODEL):
+    """
+    Compares capture_hard_skills with skillNer's stock annotate on the full spaCy
+    pipeline (nothing excluded, every pass tagged). Returns (index, missing, extra)
+    for each text whose hard skills differ.
+    """
+    import spacy
+    from skillNer.general_params import SKILL_DB
+    from skillNer.skill_extractor_class import SkillExtractor
+    baseline = SkillExtractor(spacy.load(name), SKILL_DB, PhraseMatcher)
+
+    differences = []
+    for i, text in enumerate(texts):
+        expected = {item['doc_node_value'] for item in baseline.annotate(text)['results']['full_matches']}
+        found = set(StudentInfoExtractor(text).capture_hard_skills(text))
+        if found != expected:
+            differences.append((i, sorted(expected - found), sorted(found - expected)))
+    return differences
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Check extraction against skillNer on the full spaCy pipeline.")
+    arg_parser.add_argument("pdfs", nargs = "+", help = "Resume PDFs")
+    arg_parser.add_argument("--check", action = "store_true", help = "Compare hard skills with the full-pipeline baseline")
+    args = arg_parser.parse_args()
+
+    from PdfIngestor import get_pdf_ingestor
+    texts = [get_pdf_ingestor().extract(pdf_path) for pdf_path in args.pdfs]
+    if args.check:
+        differences = hard_skill_parity(texts)
+        for i, missing, extra in differences:
+            print(f"❌ {args.pdfs[i]}: missing {missing}, extra {extra}")
+        print(f"{'❌' if differences else '✅'} {len(texts) - len(differences)} of {len(texts)} resumes match the baseline hard skills")
+        raise SystemExit(1 if differences else 0)
+    for pdf_path, text in zip(args.pdfs, texts):
+        print(f"{pdf_path}: {StudentInfoExtractor(text).extract_all_info().to_dict('records')}")
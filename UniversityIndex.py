@@ -0,0 +1,216 @@
+import re
+import argparse
+from collections import defaultdict
+from rapidfuzz import fuzz
+from rapidfuzz.utils import default_process
+
+UNIVERSITY_FILE = "universities.txt"
+MIN_ALIAS_LENGTH = 3
+# Tokens shared by more than this fraction of institutions (e.g. "university", "of")
+# are too common to select candidates on their own
+COMMON_TOKEN_RATIO = 0.05
+
+# Resume lines with known answers (None: no university), run by --check
+MATCH_CHECKS = [
+    ("National University of Singapore", "National University of Singapore (NUS)"),
+    ("Nanyang Technological University", "Nanyang Technological University, Singapore (NTU Singapore)"),
+    ("Exchange semester at NUS", "National University of Singapore (NUS)"),
+    ("Univ of California, Los Angeles (UCLA)", "University of California, Los Angeles (UCLA)"),
+    ("La Trobe University", "La Trobe University"),
+    ("UNAM", "Universidad Nacional Autónoma de México (UNAM)"),
+    ("National Autonomous University of Mexico", "Universidad Nacional Autónoma de México (UNAM)"),
+    ("UCL", "University College London (UCL)"),
+    ("HKU", "The University of Hong Kong (HKU)"),
+    ("Chinese University of Hong Kong", "The Chinese University of Hong Kong (CUHK)"),
+    ("Tokyo Tech", "Tokyo Institute of Technology (Tokyo Tech)"),
+    ("University of Edinburgh", "The University of Edinburgh"),
+    ("Université Laval", "Laval University"),
+    ("De La Salle University", None),
+    ("Singapore Polytechnic", None),
+]
+
+
+class UniversityIndex:
+    """
+    Deduplicated university name index for matching resumes.
+
+    Each institution is matched through:
+      - name variants (the full name, the name without bracketed acronyms or a
+        leading "The", and the parts of names like "EPFL – École polytechnique ...")
+        scored with fuzzy partial matching, but only against resume lines that
+        share a distinctive token (two, if the variant has several) with the
+        variant, and
+      - aliases (bracketed acronyms such as "NUS", single-word parts such as "KAIST",
+        and extra aliases from the file) matched as whole words.
+    """
+
+    def __init__(self, entries):
+        self.names = []
+        self.variants = []          # (processed variant, name id)
+        self.aliases = {}           # alias -> name id
+        self.token_index = defaultdict(set)
+        self.variant_keys = []      # distinctive tokens of each variant
+
+        explicit_aliases = {}
+        derived_aliases = defaultdict(set)
+        for name, aliases in entries:
+            if name in self.names:
+                continue
+            name_id = len(self.names)
+            self.names.append(name)
+            for alias in aliases:
+                explicit_aliases.setdefault(alias, name_id)
+            variants, derived = self.split_name(name)
+            for variant in variants:
+                self.variants.append((default_process(variant), name_id))
+            for alias in derived:
+                derived_aliases[alias].add(name_id)
+
+        # Explicit aliases win; derived aliases are only kept if unambiguous
+        self.aliases = dict(explicit_aliases)
+        for alias, name_ids in derived_aliases.items():
+            if alias not in self.aliases and len(name_ids) == 1:
+                self.aliases[alias] = next(iter(name_ids))
+        # One alternation per case mode: acronyms are case-sensitive, other aliases are not
+        self.acronyms = {alias: name_id for alias, name_id in self.aliases.items() if alias.isupper()}
+        self.lower_aliases = {alias.lower(): name_id for alias, name_id in self.aliases.items() if not alias.isupper()}
+        self.acronym_pattern = self.alias_pattern(self.acronyms, 0)
+        self.lower_alias_pattern = self.alias_pattern(self.lower_aliases, re.IGNORECASE)
+
+        # Index each variant under its distinctive tokens
+        document_frequency = defaultdict(set)
+        for variant, name_id in self.variants:
+            for token in variant.split():
+                document_frequency[token].add(name_id)
+        max_frequency = max(1, int(COMMON_TOKEN_RATIO * len(self.names)))
+        for variant_id, (variant, _) in enumerate(self.variants):
+            tokens = set(variant.split())
+            key_tokens = {token for token in tokens if len(document_frequency[token]) <= max_frequency} or tokens
+            self.variant_keys.append(key_tokens)
+            for token in key_tokens:
+                self.token_index[token].add(variant_id)
+
+    @staticmethod
+    def alias_pattern(aliases, flags):
+        if not aliases:
+            return None
+        alternation = "|".join(re.escape(alias) for alias in sorted(aliases, key = len, reverse = True))
+        return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", flags)
+
+    def alias_matches(self, line):
+        """
+        Yields (alias, name id) for every alias found as a whole word in the line.
+        """
+        if self.acronym_pattern is not None:
+            for match in self.acronym_pattern.finditer(line):
+                yield match.group(), self.acronyms[match.group()]
+        if self.lower_alias_pattern is not None:
+            for match in self.lower_alias_pattern.finditer(line):
+                yield match.group(), self.lower_aliases[match.group().lower()]
+
+    @staticmethod
+    def split_name(name):
+        """
+        Returns the fuzzy-matched variants and the derived aliases of a name.
+        """
+        variants = [name]
+        aliases = set()
+
+        # Bracketed acronyms, e.g. "(NUS)" or "(UNSW Sydney)"
+        for bracketed in re.findall(r"\(([^)]*)\)", name):
+            first = bracketed.split()[0] if bracketed.split() else ""
+            if first.isupper() or len(bracketed.split()) == 1:
+                aliases.add(bracketed.strip())
+                aliases.add(first)
+        stripped = re.sub(r"\s*\([^)]*\)", "", name).strip()
+        if stripped != name:
+            variants.append(stripped)
+        # Resumes often drop a leading "The" ("Chinese University of Hong Kong")
+        if stripped.startswith("The "):
+            variants.append(stripped[len("The "):])
+
+        # Names made of several parts, e.g. "KAIST - Korea Advanced Institute ..."
+        parts = re.split(r"\s+[–-]\s+", stripped)
+        if len(parts) > 1:
+            for part in parts:
+                if len(part.split()) == 1:
+                    aliases.add(part)
+                else:
+                    variants.append(part)
+
+        aliases = {alias for alias in aliases if len(alias) >= MIN_ALIAS_LENGTH}
+        return variants, aliases
+
+    @classmethod
+    def load(cls, path = UNIVERSITY_FILE):
+        """
+        Loads an index from a text file with one institution per line and optional
+        extra aliases after "|", separated by ";". Lines starting with "#" are skipped.
+        """
+        entries = []
+        with open(path, encoding = "utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                name, _, aliases = line.partition("|")
+                entries.append((name.strip(), [alias.strip() for alias in aliases.split(";") if alias.strip()]))
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, lines, score_cutoff = 80):
+        """
+        Returns the best matching university name in the resume lines, or None.
+        """
+        lines = [line.strip() for line in lines if line.strip()]
+        best = None  # ((score, variant length, -line number), name id)
+
+        for line_number, line in enumerate(lines):
+            # Exact alias matches score 100
+            for alias, name_id in self.alias_matches(line):
+                candidate = ((100, len(alias), -line_number), name_id)
+                best = max(best, candidate) if best else candidate
+
+            # Join the next line so names wrapped across lines still match
+            window = default_process(" ".join(lines[line_number:line_number + 2]))
+            window_tokens = set(window.split())
+            candidates = set()
+            for token in default_process(line).split():
+                candidates.update(self.token_index.get(token, ()))
+
+            for variant_id in candidates:
+                # One shared token such as "la" is not enough evidence for
+                # "La Trobe University": variants with several distinctive
+                # tokens must share at least two of them with the window
+                keys = self.variant_keys[variant_id]
+                if len(keys & window_tokens) < min(2, len(keys)):
+                    continue
+                variant, name_id = self.variants[variant_id]
+                scorer = fuzz.partial_ratio if len(window) >= len(variant) else fuzz.ratio
+                score = scorer(variant, window, score_cutoff = score_cutoff)
+                if score:
+                    candidate = ((score, len(variant), -line_number), name_id)
+                    best = max(best, candidate) if best else candidate
+
+        return self.names[best[1]] if best else None
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Match resume lines against the university index.")
+    arg_parser.add_argument("lines", nargs = "*", help = "Resume lines to match")
+    arg_parser.add_argument("--file", default = UNIVERSITY_FILE)
+    arg_parser.add_argument("--check", action = "store_true", help = "Run the known cases in MATCH_CHECKS")
+    args = arg_parser.parse_args()
+
+    index = UniversityIndex.load(args.file)
+    for line in args.lines:
+        print(f"{line} -> {index.match([line])}")
+    if args.check:
+        failures = 0
+        for line, expected in MATCH_CHECKS:
+            found = index.match([line])
+            failures += found != expected
+            print(f"{'✅' if found == expected else '❌'} {line} -> {found} (expected {expected})")
+        raise SystemExit(1 if failures else 0)
@@ -0,0 +1,324 @@
+import io
+import ast
+import os
+import sys
+import glob
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from contextlib import redirect_stdout
+from pdfminer.high_level import extract_text
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobCatalogue import load_job_data
+from JobEmbeddingIndex import JobEmbeddingIndex
+from JobClusterIndex import JobClusterIndex
+from RecommendationProcessor import RecommendationProcessor, DEFAULT_CANDIDATES
+from ClusterProcessor import ClusterProcessor
+from CompactVectors import CompactVectors, PRECISIONS
+from PdfIngestor import PdfIngestor
+
+BENCHMARK_DIR = "benchmark_results"
+DEFAULT_SIZES = [200, 1000, 5000]
+GROUPS = ("extraction", "recommendation", "database", "precision")
+
+# Fixed profile so the scoring benchmarks do not depend on the extraction models
+SAMPLE_STUDENT = {
+    "Name": "Benchmark Student",
+    "Email": ["student@example.com"],
+    "Contact Information": "+65 9123 4567",
+    "Education Level": "Bachelor",
+    "Degree Field": "Computer Science",
+    "University": "National University of Singapore (NUS)",
+    "GPA": "4.2",
+    "Work Experience": 2.0,
+    "Hard Skills": ["python", "sql", "machine learning", "data analysis", "tableau"],
+    "Soft Skills": ["teamwork", "communication", "problem solving"],
+}
+
+
+def synthetic_catalogue(job_data, n_jobs, seed = 42):
+    """
+    A catalogue of n_jobs rows sampled from job_data with fresh Job IDs, jittered
+    experience and a random subset of each job's skills, so rows are not duplicates.
+    """
+    rng = np.random.default_rng(seed)
+    jobs = job_data.iloc[rng.integers(0, len(job_data), size = n_jobs)].reset_index(drop = True)
+    jobs["Job ID"] = np.arange(1, n_jobs + 1)
+    jobs["Years of Experience"] = np.clip(jobs["Years of Experience"] + rng.integers(-1, 2, size = n_jobs), 0, None)
+
+    def subset(cell):
+        skills = list(ast.literal_eval(cell)) if isinstance(cell, str) else []
+        keep = rng.random(len(skills)) < 0.8
+        return str([skill for skill, kept in zip(skills, keep) if kept] or skills[:1])
+
+    jobs["Hard Skills"] = jobs["Hard Skills"].apply(subset)
+    jobs["Soft Skills"] = jobs["Soft Skills"].apply(subset)
+    return jobs
+
+
+def time_call(fn, repeats = 5, warmup = 1):
+    """
+    Runs fn warmup + repeats times with its output suppressed and returns the
+    wall-clock seconds of the timed runs.
+    """
+    samples = []
+    with redirect_stdout(io.StringIO()):
+        for i in range(warmup + repeats):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            if i >= warmup:
+                samples.append(elapsed)
+    return samples
+
+
+def summarize(name, params, samples):
+    ms = [sample * 1000 for sample in samples]
+    return {
+        "name": name,
+        "params": params,
+        "repeats": len(ms),
+        "mean_ms": round(statistics.mean(ms), 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "min_ms": round(min(ms), 3),
+        "max_ms": round(max(ms), 3),
+        "stdev_ms": round(statistics.stdev(ms), 3) if len(ms) > 1 else 0.0,
+    }
+
+
+def bench_extraction(pdf_paths, repeats = 5):
+    """
+    PDF text extraction (pdfminer's extract_text on the whole file, then
+    PdfIngestor's budgeted read in-process, in a child process and from its
+    cache) and StudentInfoExtractor.extract_all_info, with one entry per
+    extraction stage (from StudentInfoExtractor.timings).
+    """
+    from StudentInfoExtractor import StudentInfoExtractor
+    ModelRegistry.get_nlp()
+    ModelRegistry.get_skill_extractor()
+    ModelRegistry.get_soft_skill_matcher()
+    ModelRegistry.get_university_index()
+
+    results = []
+    for pdf_path in pdf_paths:
+        params = {"resume": os.path.basename(pdf_path)}
+        results.append(summarize("extract_text", params, time_call(lambda: extract_text(pdf_path), repeats)))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ingestors = {
+                "pdf_ingest": PdfIngestor(timeout = 0, cache_dir = None),
+                "pdf_ingest[timeout]": PdfIngestor(cache_dir = None),
+                "pdf_ingest[cached]": PdfIngestor(cache_dir = cache_dir),
+            }
+            for name, ingestor in ingestors.items():
+                results.append(summarize(name, params, time_call(lambda: ingestor.extract(pdf_path), repeats)))
+        text = ingestors["pdf_ingest"].extract(pdf_path)
+
+        stage_samples = {}
+        def extract():
+            extractor = StudentInfoExtractor(text)
+            extractor.extract_all_info()
+            for stage, seconds in extractor.timings.items():
+                stage_samples.setdefault(stage, []).append(seconds)
+
+        results.append(summarize("extract_all_info", params, time_call(extract, repeats, warmup = 0)))
+        for stage, samples in stage_samples.items():
+            results.append(summarize(f"extract_all_info[{stage}]", params, samples))
+    return results
+
+
+def bench_recommendation(job_data, sizes, repeats = 5, top_k = 5, index_dir = None):
+    """
+    Per-request recommendation latency on synthetic catalogues of each size. Job
+    indexes are built in index_dir (a temporary directory by default) and their
+    build time is reported once.
+
+    The recommend_* and ClusterProcessor entries pass the prebuilt job index, so
+    they time scoring only. recommend_top_jobs[as_main] times a request as main()
+    makes it: load_job_data on the catalogue CSV, then the index lookup by
+    catalogue hash, then scoring. Its first request, which also compiles and
+    hashes the catalogue, is reported separately as request_as_main[cold].
+    """
+    model = ModelRegistry.get_sentence_model(MODEL_NAME)
+    skill_cache = ModelRegistry.get_skill_cache(MODEL_NAME)
+    student = pd.Series(SAMPLE_STUDENT)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index_dir = index_dir or tmp_dir
+        for size in sizes:
+            catalogue = synthetic_catalogue(job_data, size)
+            params = {"n_jobs": size, "top_k": top_k}
+
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                job_index = JobEmbeddingIndex.load_or_build(catalogue, model, MODEL_NAME, index_dir, skill_cache)
+                index_seconds = time.perf_counter() - start
+                start = time.perf_counter()
+                job_clusters = JobClusterIndex.load_or_build(job_index)
+                cluster_seconds = time.perf_counter() - start
+            results.append(summarize("job_index_build", {"n_jobs": size}, [index_seconds]))
+            results.append(summarize("job_cluster_build", {"n_jobs": size}, [cluster_seconds]))
+
+            def semantic(skill_scoring = "mean"):
+                RecommendationProcessor(student, catalogue.copy(), job_index, skill_scoring).recommend_top_jobs(top_k)
+
+            def two_stage():
+                RecommendationProcessor(student, catalogue.copy(), job_index).recommend_two_stage(top_k, DEFAULT_CANDIDATES)
+
+            csv_path = os.path.join(tmp_dir, f"jobs_{size}.csv")
+            catalogue.to_csv(csv_path, index = False)
+            catalogue_dir = os.path.join(tmp_dir, "job_catalogue")
+
+            def as_main():
+                # main() passes no job_index: the index is looked up from the catalogue
+                job_df = load_job_data(csv_path, catalogue_dir)
+                index = JobEmbeddingIndex.load_or_build(job_df, model, MODEL_NAME, index_dir, skill_cache)
+                RecommendationProcessor(student, job_df, index).recommend_top_jobs(top_k)
+
+            def clustering():
+                processor = ClusterProcessor(student, catalogue, job_index = job_index, job_clusters = job_clusters)
+                processor.compute_job_score()
+                processor.recommend_top_k(top_k)
+
+            results.append(summarize("recommend_top_jobs", params, time_call(semantic, repeats)))
+            results.append(summarize("request_as_main[cold]", params, time_call(as_main, repeats = 1, warmup = 0)))
+            results.append(summarize("recommend_top_jobs[as_main]", params, time_call(as_main, repeats)))
+            results.append(summarize("recommend_top_jobs[coverage]", params, time_call(lambda: semantic("coverage"), repeats)))
+            results.append(summarize("recommend_two_stage", {**params, "n_candidates": DEFAULT_CANDIDATES}, time_call(two_stage, repeats)))
+            results.append(summarize("ClusterProcessor.compute_job_score", params, time_call(clustering, repeats)))
+    return results
+
+
+def top_k_overlap(scores, reference, k):
+    """
+    Mean fraction of each row's top k under the reference scores that is also in
+    its top k under scores.
+    """
+    top = np.argsort(-scores, axis = 1, kind = "stable")[:, :k]
+    reference_top = np.argsort(-reference, axis = 1, kind = "stable")[:, :k]
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(top, reference_top)]))
+
+
+def bench_precision(job_data, sizes, repeats = 5, k = 10, n_queries = 200):
+    """
+    Storage size, cosine scoring latency and top-k overlap with float64 scoring for
+    each embedding precision, per job index array. Queries are job vectors with
+    noise, standing in for student vectors near real jobs.
+    """
+    model = ModelRegistry.get_sentence_model(MODEL_NAME)
+    skill_cache = ModelRegistry.get_skill_cache(MODEL_NAME)
+    rng = np.random.default_rng(42)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            with redirect_stdout(io.StringIO()):
+                job_index = JobEmbeddingIndex.load_or_build(synthetic_catalogue(job_data, size), model, MODEL_NAME, tmp_dir, skill_cache, "float32")
+            for name in JobEmbeddingIndex.ARRAYS:
+                vectors = np.asarray(getattr(job_index, name))
+                base = vectors[rng.choice(size, size = min(n_queries, size), replace = False)]
+                queries = (base + rng.normal(scale = base.std(), size = base.shape)).astype(np.float32)
+
+                # float64 reference
+                exact = vectors.astype(np.float64)
+                norms = np.outer(np.linalg.norm(queries, axis = 1), np.linalg.norm(exact, axis = 1))
+                reference = np.divide(queries.astype(np.float64) @ exact.T, norms, out = np.zeros(norms.shape), where = norms > 0)
+
+                for precision in PRECISIONS:
+                    compact = CompactVectors.encode(vectors, precision)
+                    result = summarize(
+                        "cosine_scoring", {"n_jobs": size, "array": name, "precision": precision, "n_queries": len(queries)},
+                        time_call(lambda: compact.cosine(queries), repeats)
+                    )
+                    result[f"top{k}_overlap"] = round(top_k_overlap(compact.cosine(queries), reference, k), 4)
+                    result["storage_mb"] = round(compact.nbytes / 2 ** 20, 3)
+                    results.append(result)
+    return results
+
+
+def bench_database(row_counts, repeats = 5):
+    """
+    Student and recommendation writes through the write-behind queue, against a
+    SQLite file standing in for PostgreSQL.
+    """
+    from databaseProcessor import SQLiteWriter, WriteBehindQueue
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in row_counts:
+            students = pd.DataFrame([{**SAMPLE_STUDENT, "Name": f"Student {i}"} for i in range(n_rows)])
+            recommendation = {"name": None, "first_recommendation": "Data Scientist", "second_recommendation": "Data Analyst",
+                              "third_recommendation": None, "fourth_recommendation": None, "fifth_recommendation": None}
+            write_queue = WriteBehindQueue(SQLiteWriter(os.path.join(tmp_dir, f"bench_{n_rows}.db")), flush_interval = 0.05)
+
+            def write():
+                write_queue.put_students(students)
+                for name in students["Name"]:
+                    write_queue.put_recommendation({**recommendation, "name": name})
+                write_queue.flush()
+
+            results.append(summarize("database_write", {"n_students": n_rows, "writer": "sqlite"}, time_call(write, repeats)))
+            write_queue.close()
+    return results
+
+
+def run_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec = "seconds"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "model": MODEL_NAME,
+    }
+
+
+def save_results(results, output = None):
+    report = {"meta": run_metadata(), "results": results}
+    if output is None:
+        os.makedirs(BENCHMARK_DIR, exist_ok = True)
+        stamp = report["meta"]["timestamp"].replace(":", "").replace("-", "")
+        output = os.path.join(BENCHMARK_DIR, f"{stamp}_{report['meta']['commit'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent = 2)
+    return output
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description = "Benchmark extraction, scoring and database stages.")
+    arg_parser.add_argument("--groups", nargs = "+", choices = GROUPS, default = list(GROUPS))
+    arg_parser.add_argument("--csv", default = "job_data.csv")
+    arg_parser.add_argument("--sizes", nargs = "+", type = int, default = DEFAULT_SIZES, help = "Synthetic catalogue sizes")
+    arg_parser.add_argument("--resumes", default = "resume/*.pdf", help = "Glob of resume PDFs for extraction")
+    arg_parser.add_argument("--db-rows", nargs = "+", type = int, default = [1, 100, 1000])
+    arg_parser.add_argument("--repeats", type = int, default = 5)
+    arg_parser.add_argument("--output", default = None, help = f"JSON file (default: {BENCHMARK_DIR}/<time>_<commit>.json)")
+    args = arg_parser.parse_args()
+
+    results = []
+    if "extraction" in args.groups:
+        results += bench_extraction(sorted(glob.glob(args.resumes)), args.repeats)
+    if "recommendation" in args.groups:
+        results += bench_recommendation(pd.read_csv(args.csv), args.sizes, args.repeats)
+    if "database" in args.groups:
+        results += bench_database(args.db_rows, args.repeats)
+    if "precision" in args.groups:
+        results += bench_precision(pd.read_csv(args.csv), args.sizes, args.repeats)
+
+    for result in results:
+        params = ", ".join(f"{key}={value}" for key, value in result["params"].items())
+        extra = "".join(f", {key} {value}" for key, value in result.items() if key.startswith("top") or key == "storage_mb")
+        print(f"{result['name']:<45} {params:<45} median {result['median_ms']:>10.3f} ms{extra}")
+    print(f"✅ Benchmark results saved to {save_results(results, args.output)}")
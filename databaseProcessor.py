@@ -1,104 +1,365 @@
 import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
 import psycopg2
 import pandas as pd
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from Metrics import get_metrics
+
+STUDENT_QUERY = '''
+    INSERT INTO student (
+        name,
+        email,
+        contact_information,
+        education_level,
+        degree_field,
+        university,
+        gpa,
+        work_experience_years,
+        hard_skills,
+        soft_skills
+    ) VALUES %s
+    ON CONFLICT DO NOTHING;
+'''
+
+RECOMMENDATION_QUERY = '''
+    INSERT INTO recommendation (
+        name,
+        first_recommendation,
+        second_recommendation,
+        third_recommendation,
+        fourth_recommendation,
+        fifth_recommendation
+    ) VALUES %s
+    ON CONFLICT DO NOTHING;
+'''
+
+RECOMMENDATION_COLUMNS = [
+    "name",
+    "first_recommendation",
+    "second_recommendation",
+    "third_recommendation",
+    "fourth_recommendation",
+    "fifth_recommendation"
+]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Process-wide PostgreSQL connection pool, created on first use from the .env
+    settings. DB_POOL_MIN/DB_POOL_MAX bound the number of open connections.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Load environment variables
+                load_dotenv(override = True)
+                _pool = ThreadedConnectionPool(
+                    int(os.getenv("DB_POOL_MIN", "1")),
+                    int(os.getenv("DB_POOL_MAX", "10")),
+                    host=os.getenv("DB_HOST"),
+                    database=os.getenv("DB_NAME"),
+                    user=os.getenv("DB_USER"),
+                    password=os.getenv("DB_PASSWORD"),
+                    port=os.getenv("DB_PORT", "5432")
+                )
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrows a pooled connection for one transaction: commits on success, rolls back on error.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
+def student_row(row):
+    """
+    Converts one extracted student profile into the student table's column values.
+    """
+    email = row.get("Email")
+    if isinstance(email, list):
+        # Extraction returns every address found, possibly none
+        email = email[0] if email else None
+    return (
+        row.get("Name"),
+        email,
+        row.get("Contact Information"),
+        row.get("Education Level"),
+        row.get("Degree Field"),
+        row.get("University"),
+        row.get("GPA"),
+        float(row["Work Experience"]) if pd.notna(row["Work Experience"]) else None,
+        Json(row.get("Hard Skills", [])),
+        Json(row.get("Soft Skills", []))
+    )
+
+
+def recommendation_row(student):
+    return tuple(student[column] for column in RECOMMENDATION_COLUMNS)
+
+
+class DatabaseWriter:
+    """
+    Writes student and recommendation rows in bulk with execute_values, one
+    transaction per write() call. WriteBehindQueue decides when to write.
+    """
+    # Errors worth retrying: the connection or server, not the rows
+    TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+    def __init__(self, batch_size = 500):
+        self.batch_size = batch_size
+
+    def write(self, students, recommendations):
+        """
+        Writes the given rows in a single transaction.
+        """
+        with get_metrics().span("db_write", writer = "postgres", students = len(students), recommendations = len(recommendations)):
+            with pooled_connection() as conn:
+                with conn.cursor() as cur:
+                    if students:
+                        execute_values(cur, STUDENT_QUERY, students, page_size = self.batch_size)
+                    if recommendations:
+                        execute_values(cur, RECOMMENDATION_QUERY, recommendations, page_size = self.batch_size)
+
+
+class SQLiteWriter:
+    """
+    Local stand-in for DatabaseWriter that writes the same rows to a SQLite file,
+    for development and tests without a PostgreSQL server.
+    """
+    # e.g. "database is locked" while another process writes
+    TRANSIENT_ERRORS = (sqlite3.OperationalError,)
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS student (name TEXT, email TEXT, contact_information TEXT, "
+                "education_level TEXT, degree_field TEXT, university TEXT, gpa TEXT, "
+                "work_experience_years REAL, hard_skills TEXT, soft_skills TEXT)"
+            )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS recommendation ({', '.join(f'{column} TEXT' for column in RECOMMENDATION_COLUMNS)})"
+            )
+
+    @staticmethod
+    def to_sqlite(value):
+        return json.dumps(value.adapted) if isinstance(value, Json) else value
+
+    def write(self, students, recommendations):
+        with get_metrics().span("db_write", writer = "sqlite", students = len(students), recommendations = len(recommendations)):
+            with sqlite3.connect(self.path) as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO student VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [tuple(self.to_sqlite(value) for value in row) for row in students]
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO recommendation VALUES (?, ?, ?, ?, ?, ?)",
+                    recommendations
+                )
+
+
+class WriteBehindQueue:
+    """
+    Background writer for student and recommendation records. Callers enqueue and
+    return immediately; a daemon thread groups records into batches of up to
+    batch_size (or whatever arrived within flush_interval seconds) and writes each
+    batch through writer.write(students, recommendations) in one transaction.
+
+    Batches that fail with one of writer.TRANSIENT_ERRORS are retried with
+    exponential backoff up to max_retries times. On any other error the batch is
+    written record by record, so only the offending records count as failed.
+    Pending records are flushed on close(), which also runs at interpreter exit.
+    """
+    _STOP = object()
+
+    def __init__(self, writer, batch_size = 500, flush_interval = 1.0, max_retries = 5, retry_backoff = 0.5):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.written = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target = self._run, name = "write-behind", daemon = True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put_students(self, df):
+        for _, row in df.iterrows():
+            self._queue.put(("student", student_row(row)))
+
+    def put_recommendation(self, student):
+        self._queue.put(("recommendation", recommendation_row(student)))
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def _next_batch(self):
+        """
+        Blocks for the first record, then collects more until the batch is full or
+        flush_interval has passed. Returns (batch, stop requested).
+        """
+        first = self._queue.get()
+        if first is self._STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                record = self._queue.get(timeout = max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if record is self._STOP:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    def _write_with_retry(self, batch):
+        students = [row for kind, row in batch if kind == "student"]
+        recommendations = [row for kind, row in batch if kind == "recommendation"]
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.writer.write(students, recommendations)
+                self.written += len(batch)
+                return
+            except self.writer.TRANSIENT_ERRORS as e:
+                if attempt == self.max_retries:
+                    self.failed += len(batch)
+                    print(f"❌ Dropping {len(batch)} database record(s) after {attempt + 1} attempts: {e}")
+                    return
+                time.sleep(self.retry_backoff * 2 ** attempt)
+            except Exception as e:
+                if len(batch) == 1:
+                    self.failed += 1
+                    kind, row = batch[0]
+                    print(f"❌ Skipping {kind} record for {row[0]}: {e}")
+                    return
+                # A bad record must not take the rest of its batch with it
+                for record in batch:
+                    self._write_with_retry([record])
+                return
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                self._write_with_retry(batch)
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+
+        # Drain whatever was enqueued before close()
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        records = [record for record in remaining if record is not self._STOP]
+        for start in range(0, len(records), self.batch_size):
+            self._write_with_retry(records[start:start + self.batch_size])
+        for _ in remaining:
+            self._queue.task_done()
+
+    def flush(self):
+        """
+        Blocks until every record enqueued so far has been written (or dropped).
+        """
+        self._queue.join()
+
+    def close(self, timeout = None):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """
+    Process-wide write-behind queue. Writes go to PostgreSQL, or to the SQLite file
+    at SQLITE_DB_PATH when that is set. Batches hold up to DB_WRITE_BATCH_SIZE
+    records and are written at most DB_FLUSH_INTERVAL seconds after their first one.
+    """
+    global _write_queue
+    if _write_queue is None:
+        with _write_queue_lock:
+            if _write_queue is None:
+                load_dotenv(override = True)
+                sqlite_path = os.getenv("SQLITE_DB_PATH")
+                writer = SQLiteWriter(sqlite_path) if sqlite_path else DatabaseWriter()
+                _write_queue = WriteBehindQueue(
+                    writer,
+                    batch_size = int(os.getenv("DB_WRITE_BATCH_SIZE", "500")),
+                    flush_interval = float(os.getenv("DB_FLUSH_INTERVAL", "1.0"))
+                )
+    return _write_queue
+
 
 class databaseProcessor:
     def __init__(self, df):
         self.df = df
-    
-    def insert_student(self):
-        # Load environment variables
-        load_dotenv(override=True)
-
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            database=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            port=os.getenv("DB_PORT", "5432")
-        )
-        # Create cursor
-        cur = conn.cursor()
-
-        query = '''
-            INSERT INTO student (
-                name,
-                email,
-                contact_information,
-                education_level,
-                degree_field,
-                university,
-                gpa,
-                work_experience_years,
-                hard_skills,
-                soft_skills
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT DO NOTHING;
-        '''
-
-        # Insert row-by-row
-        for _, row in self.df.iterrows():
-            try:
-                cur.execute(query, (
-                    row.get("Name"),
-                    row.get("Email")[0] if isinstance(row.get("Email"), list) else row.get("Email"),
-                    row.get("Contact Information"),
-                    row.get("Education Level"),
-                    row.get("Degree Field"),
-                    row.get("University"),
-                    row.get("GPA"),
-                    float(row["Work Experience"]) if pd.notna(row["Work Experience"]) else None,
-                    Json(row.get("Hard Skills", [])),
-                    Json(row.get("Soft Skills", []))
-                ))
-            except Exception as e:
-                print(f"Error inserting row: {row.to_dict()}")
-                print("Exception:", e)
 
-        # Commit and close
-        conn.commit()
-        cur.close()
-        conn.close()
+    def insert_student(self):
+        writer = DatabaseWriter(batch_size = max(len(self.df), 1))
+        rows = [student_row(row) for _, row in self.df.iterrows()]
+        try:
+            writer.write(rows, [])
+        except writer.TRANSIENT_ERRORS:
+            raise
+        except Exception:
+            # Insert row-by-row so only the rows that fail are skipped
+            for (_, row), values in zip(self.df.iterrows(), rows):
+                try:
+                    writer.write([values], [])
+                except writer.TRANSIENT_ERRORS:
+                    raise
+                except Exception as e:
+                    print(f"Error inserting row: {row.to_dict()}")
+                    print("Exception:", e)
         print("✅ Insert student complete.")
-    
+
     def insert_job(self, student):
-        # Load environment variables
-        load_dotenv(override = True)
-
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            database=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            port=os.getenv("DB_PORT", "5432")
-        )
-        # Create cursor
-        cur = conn.cursor()
-
-        query = '''
-            INSERT INTO recommendation (
-                name,
-                first_recommendation,
-                second_recommendation,
-                third_recommendation,
-                fourth_recommendation,
-                fifth_recommendation
-            ) VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT DO NOTHING;
-        '''
-
-
-        cur.execute(query, (
-            student["name"],
-            student["first_recommendation"],
-            student["second_recommendation"],
-            student["third_recommendation"],
-            student["fourth_recommendation"],
-            student["fifth_recommendation"]
-        ))
-        conn.commit()
-        cur.close()
-        conn.close()
-        print("✅ Insert job recommendation complete.")
\ No newline at end of file
+        self.insert_jobs([student])
+
+    def insert_jobs(self, students):
+        writer = DatabaseWriter(batch_size = max(len(students), 1))
+        writer.write([], [recommendation_row(student) for student in students])
+        print("✅ Insert job recommendation complete.")
@@ -1,53 +1,234 @@
+import os
+import glob
 import argparse
 import pandas as pd
-from pdfminer.high_level import extract_text
+from concurrent.futures import ProcessPoolExecutor
 from StudentInfoExtractor import StudentInfoExtractor
-from RecommendationProcessor import RecommendationProcessor
-from databaseProcessor import databaseProcessor
+from RecommendationProcessor import RecommendationProcessor, DEFAULT_CANDIDATES, SKILL_SCORING
+from databaseProcessor import get_write_queue
 from ClusterProcessor import ClusterProcessor
+from ModelRegistry import ModelRegistry
+from JobCatalogue import load_job_data
+from Metrics import Metrics, get_metrics, set_metrics, InMemorySink
+from PdfIngestor import get_pdf_ingestor
+from ANNIndex import SEARCH_KINDS
 
-def main(text, top_k = 5, algorithm = "semantic"):
-    # Load job dataset (hardcoded path)
-    job_df = pd.read_csv("job_data.csv")
+def extract_pdf_text(source):
+    """
+    Text of a resume PDF (a path, bytes or a file object) within the PDF_MAX_PAGES/
+    PDF_MAX_CHARS budget, timed as the "pdf_extract" stage. Re-reading a PDF that
+    was extracted before returns the cached text.
+    """
+    with get_metrics().span("pdf_extract") as labels:
+        result = get_pdf_ingestor().ingest(source)
+        labels["characters"] = len(result["text"])
+        labels["cached"] = result["cached"]
+    return result["text"]
 
-    # Extract structured student info
+def extract_profile(text):
+    """
+    Extracts the structured student profile from resume text (one-row DataFrame,
+    empty if nothing could be extracted).
+    """
     extractor = StudentInfoExtractor(text)
     nlp_df = extractor.extract_all_info()
+    if nlp_df.empty:
+        print("❌ No student information could be extracted from the resume.")
+        return nlp_df
     print("✅ Student info extracted")
     print(nlp_df.iloc[0])
+    return nlp_df
 
-    if nlp_df.empty:
-        print("❌ No student information could be extracted from the resume.")
-        return
-    
-    # Insert student's recommendation into the database
-    db_processor = databaseProcessor(nlp_df)
-    db_processor.insert_student()
-    print("✅ Student inserted into database")
-    
-    # Use the most recent student profile
-    student_profile = nlp_df.iloc[-1]
-
-    # Recommend top 5 jobs
+def rank_jobs(student_profile, job_df, top_k = 5, algorithm = "Semantic", n_candidates = DEFAULT_CANDIDATES,
+              skill_scoring = "mean", job_index = None, job_clusters = None):
+    """
+    Recommends the top k jobs for one extracted student profile. Returns the
+    recommendation table and the row for the recommendation table in the database.
+    """
     if algorithm == "Semantic":
         print("Recommending Jobs using semantic matching...")
-        recommender = RecommendationProcessor(student_profile, job_df)
+        recommender = RecommendationProcessor(student_profile, job_df, job_index, skill_scoring = skill_scoring)
         recommended_jobs = recommender.recommend_top_jobs(top_k)
-        new_student = recommender.generate_recommendation_row(recommender.student.Name, recommended_jobs)
-
-    
     elif algorithm == "Clustering":
         print("Recommending Jobs using clustering matching...")
-        processor = ClusterProcessor(student_profile, job_df)
-        processor.compute_job_score()
-        recommended_jobs = processor.recommend_top_k(k = top_k)
-        new_student = processor.generate_recommendation_row(processor.student.Name, recommended_jobs)
+        recommender = ClusterProcessor(student_profile, job_df, job_index = job_index, job_clusters = job_clusters)
+        recommender.compute_job_score()
+        recommended_jobs = recommender.recommend_top_k(k = top_k)
+    elif algorithm == "Two-Stage":
+        print(f"Recommending Jobs using two-stage matching (top {n_candidates} candidates reranked)...")
+        recommender = RecommendationProcessor(student_profile, job_df, job_index, skill_scoring = skill_scoring)
+        recommended_jobs = recommender.recommend_two_stage(top_k, n_candidates = n_candidates)
+    else:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    return recommended_jobs, recommender.generate_recommendation_row(student_profile['Name'], recommended_jobs)
+
+def main(text, top_k = 5, algorithm = "semantic", n_candidates = DEFAULT_CANDIDATES, skill_scoring = "mean"):
+    with get_metrics().span("request", algorithm = algorithm):
+        # Load the compiled job catalogue (hardcoded path)
+        job_df = load_job_data("job_data.csv")
+
+        # Extract structured student info
+        nlp_df = extract_profile(text)
+        if nlp_df.empty:
+            return
+
+        # Queue the student for the database; rows are written in the background
+        write_queue = get_write_queue()
+        write_queue.put_students(nlp_df)
+        print("✅ Student queued for database insert")
+
+        # Use the most recent student profile
+        student_profile = nlp_df.iloc[-1]
+        recommended_jobs, new_student = rank_jobs(student_profile, job_df, top_k, algorithm, n_candidates, skill_scoring)
+
+        # Queue student's recommendation for the database
+        write_queue.put_recommendation(new_student)
+        return recommended_jobs
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def collect_resume_paths(patterns):
+    """
+    Expands directories and glob patterns into a sorted list of PDF paths.
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.pdf")
+        paths.update(path for path in glob.glob(pattern) if path.lower().endswith(".pdf"))
+    return sorted(paths)
+
+_worker_sink = None
+
+def init_extraction_worker():
+    # The worker's spans are only kept in memory and sent back to the parent, which
+    # exports them; the configured sinks (METRICS_SINKS) would export them twice
+    global _worker_sink
+    _worker_sink = InMemorySink()
+    set_metrics(Metrics([_worker_sink]))
+
+    # Each worker process loads its own spaCy pipeline and skill extractor once
+    ModelRegistry.get_nlp()
+    ModelRegistry.get_skill_extractor()
 
-    # Insert student's recommendaiton into the database
-    db_processor.insert_job(new_student)
-    return recommended_jobs
+def extract_resume(pdf_path):
+    """
+    Extracts the structured student profile from one resume PDF (runs in a worker).
+    Returns the profile and the (stage, seconds, labels) spans recorded while extracting it.
+    """
+    try:
+        text = extract_pdf_text(pdf_path)
+        nlp_df = StudentInfoExtractor(text).extract_all_info()
+        nlp_df["Resume"] = os.path.basename(pdf_path)
+    except Exception as e:
+        print(f"❌ Failed to process {pdf_path}: {e}")
+        nlp_df = pd.DataFrame()
+
+    return nlp_df, worker_spans()
+
+def worker_spans():
+    """
+    Takes the (stage, seconds, labels) spans recorded in this worker since the last call.
+    """
+    if _worker_sink is None:
+        return []
+    spans = [(event["name"], event["seconds"], event["labels"]) for event in _worker_sink.events if event["type"] == "span"]
+    _worker_sink.events.clear()
+    return spans
+
+def recommend_students(nlp_df, job_df, top_k = 5, algorithm = "Semantic", chunk_size = None, n_candidates = DEFAULT_CANDIDATES,
+                       skill_scoring = "mean", job_index = None, job_clusters = None):
+    """
+    Recommends the top k jobs for every student profile in nlp_df with batched
+    students x jobs scoring. Returns one recommendation table per student.
+    """
+    if algorithm == "Semantic":
+        return RecommendationProcessor.recommend_batch(
+            nlp_df, job_df, top_n = top_k, job_index = job_index, chunk_size = chunk_size, skill_scoring = skill_scoring
+        )
+    elif algorithm == "Clustering":
+        return ClusterProcessor.recommend_batch(
+            nlp_df, job_df, k = top_k, job_index = job_index, job_clusters = job_clusters, chunk_size = chunk_size
+        )
+    elif algorithm == "Two-Stage":
+        return RecommendationProcessor.recommend_batch(
+            nlp_df, job_df, top_n = top_k, job_index = job_index, chunk_size = chunk_size,
+            n_candidates = n_candidates, skill_scoring = skill_scoring
+        )
+    raise ValueError(f"Unknown algorithm: {algorithm}")
+
+def batch_main(pdf_paths, top_k = 5, algorithm = "Semantic", workers = None, chunk_size = None, n_candidates = DEFAULT_CANDIDATES, skill_scoring = "mean"):
+    # Load job dataset (hardcoded path)
+    job_df = load_job_data("job_data.csv")
+
+    if not pdf_paths:
+        print("❌ No resume PDFs found.")
+        return
+
+    # Extract structured student info across a process pool
+    metrics = get_metrics()
+    profiles = []
+    with ProcessPoolExecutor(max_workers = workers, initializer = init_extraction_worker) as pool:
+        for df, spans in pool.map(extract_resume, pdf_paths, chunksize = 4):
+            for name, seconds, labels in spans:
+                metrics.record(name, seconds, **labels)
+            if not df.empty:
+                profiles.append(df)
+    if not profiles:
+        print("❌ No student information could be extracted from the resumes.")
+        return
+    nlp_df = pd.concat(profiles, ignore_index = True)
+    print(f"✅ Student info extracted for {len(nlp_df)} of {len(pdf_paths)} resumes")
+
+    # Queue students for the database; rows are written in the background
+    write_queue = get_write_queue()
+    write_queue.put_students(nlp_df)
+    print("✅ Students queued for database insert")
+
+    # Score all students against the job index at once
+    print(f"Recommending Jobs using {algorithm.lower()} matching...")
+    recommended_jobs = recommend_students(nlp_df, job_df, top_k = top_k, algorithm = algorithm, chunk_size = chunk_size, n_candidates = n_candidates, skill_scoring = skill_scoring)
+    score_column = "similarity" if algorithm == "Clustering" else "Total Score"
+
+    for (_, student), top_jobs in zip(nlp_df.iterrows(), recommended_jobs):
+        print(f"\nTop {top_k} Recommended Jobs for {student['Name']} ({student['Resume']}):\n")
+        for _, row in top_jobs.iterrows():
+            print(f"{row['Job Title']}: {row[score_column]:.3f}")
+        write_queue.put_recommendation(RecommendationProcessor.generate_recommendation_row(student['Name'], top_jobs))
+
+    # Wait for the background writes before the CLI exits
+    write_queue.flush()
+    print(f"✅ Database writes complete ({write_queue.written} written, {write_queue.failed} failed)")
+    return nlp_df, recommended_jobs
 
 if __name__ == "__main__":
-    resume_pdf_file = "Tay Zhi Wen Jeremiah CV.pdf"
-    text = extract_text(f"./resume/{resume_pdf_file}")
-    main(text, top_k = 5, algorithm = "Clustering")
+    arg_parser = argparse.ArgumentParser(description = "Recommend jobs for one or more resumes.")
+    arg_parser.add_argument("resumes", nargs = "*", help = "Resume PDFs, directories or glob patterns (batch mode)")
+    arg_parser.add_argument("--top-k", type = int, default = 5)
+    arg_parser.add_argument("--algorithm", choices = ["Semantic", "Clustering", "Two-Stage"], default = "Clustering")
+    arg_parser.add_argument("--workers", type = int, default = None, help = "Extraction processes (default: CPU count)")
+    arg_parser.add_argument("--chunk-size", type = positive_int, default = None, help = "Students scored per students x jobs matrix")
+    arg_parser.add_argument("--candidates", type = int, default = DEFAULT_CANDIDATES, help = "Jobs retrieved for reranking (Two-Stage)")
+    arg_parser.add_argument("--skill-scoring", choices = SKILL_SCORING, default = "mean", help = "Skill similarity for Semantic/Two-Stage")
+    arg_parser.add_argument("--search-index", choices = SEARCH_KINDS, default = None, help = "Candidate search for Two-Stage (default: SEARCH_INDEX or exact)")
+    arg_parser.add_argument("--metrics", action = "store_true", help = "Print p50/p95/p99 per stage at the end")
+    args = arg_parser.parse_args()
+    if args.search_index:
+        # Read by get_search_index wherever the Two-Stage candidates are retrieved
+        os.environ["SEARCH_INDEX"] = args.search_index
+
+    if args.resumes:
+        batch_main(collect_resume_paths(args.resumes), top_k = args.top_k, algorithm = args.algorithm, workers = args.workers, chunk_size = args.chunk_size, n_candidates = args.candidates, skill_scoring = args.skill_scoring)
+    else:
+        resume_pdf_file = "Tay Zhi Wen Jeremiah CV.pdf"
+        text = extract_pdf_text(f"./resume/{resume_pdf_file}")
+        main(text, top_k = args.top_k, algorithm = args.algorithm, n_candidates = args.candidates, skill_scoring = args.skill_scoring)
+
+    # Export to the configured sinks (METRICS_SINKS) and optionally show the distribution
+    get_metrics().flush()
+    if args.metrics:
+        get_metrics().print_summary()
@@ -0,0 +1,276 @@
+import os
+import json
+import asyncio
+import multiprocessing
+import pandas as pd
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Union
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from pydantic import BaseModel, ConfigDict, Field
+from dotenv import load_dotenv
+from ModelRegistry import ModelRegistry, MODEL_NAME
+from JobCatalogue import load_job_data
+from JobEmbeddingIndex import JobEmbeddingIndex
+from JobClusterIndex import JobClusterIndex
+from ANNIndex import get_search_index
+from RecommendationProcessor import RecommendationProcessor, DEFAULT_CANDIDATES
+from databaseProcessor import get_write_queue
+from Metrics import get_metrics
+from main import extract_pdf_text, extract_profile, rank_jobs, recommend_students, init_extraction_worker, worker_spans
+
+load_dotenv()
+
+# Service settings (environment variables)
+JOB_DATA_PATH = os.getenv("JOB_DATA_PATH", "job_data.csv")
+EXTRACT_WORKERS = int(os.getenv("SERVICE_EXTRACT_WORKERS", "2"))       # processes for PDF/NLP extraction
+SCORING_THREADS = int(os.getenv("SERVICE_SCORING_THREADS", "4"))       # threads for embedding and scoring
+MAX_CONCURRENCY = int(os.getenv("SERVICE_MAX_CONCURRENCY", "8"))       # requests processed at once
+QUEUE_TIMEOUT = float(os.getenv("SERVICE_QUEUE_TIMEOUT", "30"))        # seconds to wait for a slot before 503
+ALGORITHMS = ("Semantic", "Clustering", "Two-Stage")
+
+
+class StudentProfile(BaseModel):
+    """
+    An extracted student profile, with the column names extract_all_info uses
+    ("Hard Skills", ...). Name and Hard Skills are required; other columns
+    (e.g. "Resume") are kept as they are.
+    """
+    model_config = ConfigDict(populate_by_name = True, extra = "allow")
+
+    name: str = Field(alias = "Name")
+    email: Union[List[str], str, None] = Field([], alias = "Email")
+    contact_information: Optional[str] = Field("", alias = "Contact Information")
+    education_level: Optional[str] = Field("", alias = "Education Level")
+    degree_field: Optional[str] = Field("", alias = "Degree Field")
+    university: Optional[str] = Field("", alias = "University")
+    gpa: Optional[str] = Field("", alias = "GPA")
+    work_experience: float = Field(0, ge = 0, alias = "Work Experience")
+    hard_skills: List[str] = Field(alias = "Hard Skills")
+    soft_skills: List[str] = Field([], alias = "Soft Skills")
+
+    def columns(self):
+        return self.model_dump(by_alias = True)
+
+
+class RecommendRequest(BaseModel):
+    profile: StudentProfile
+    top_k: int = Field(5, ge = 1)
+    algorithm: str = "Semantic"
+    n_candidates: int = Field(DEFAULT_CANDIDATES, ge = 1)
+    skill_scoring: str = "mean"
+    save: bool = True
+
+
+class BatchRecommendRequest(BaseModel):
+    profiles: List[StudentProfile]
+    top_k: int = Field(5, ge = 1)
+    algorithm: str = "Semantic"
+    n_candidates: int = Field(DEFAULT_CANDIDATES, ge = 1)
+    skill_scoring: str = "mean"
+    chunk_size: Optional[int] = Field(None, ge = 1)
+    save: bool = True
+
+
+class SaveRequest(BaseModel):
+    profile: StudentProfile
+    job_titles: List[str]
+
+
+class ServiceState:
+    """
+    Everything the service keeps warm between requests: the job catalogue and its
+    indexes, the worker pools and the concurrency limit. Models live in ModelRegistry.
+    """
+
+    def __init__(self):
+        ModelRegistry.warm_up()
+        self.job_df = load_job_data(JOB_DATA_PATH)
+        model = ModelRegistry.get_sentence_model(MODEL_NAME)
+        self.job_index = JobEmbeddingIndex.for_catalogue(
+            self.job_df, model, skill_cache = ModelRegistry.get_skill_cache(MODEL_NAME)
+        )
+        self.job_clusters = JobClusterIndex.load_or_build(self.job_index)
+        get_search_index(self.job_index)
+
+        # Starts the background writer; PostgreSQL connections are opened on its first write
+        self.write_queue = get_write_queue()
+
+        # spaCy/regex extraction holds the GIL, so it runs in processes; encoding and
+        # numpy scoring release it and share the loaded model, so they run in threads.
+        # Workers are spawned, not forked: a fork would inherit the locks held by the
+        # model, writer and metrics threads and the open database handles. Each
+        # worker loads its own models in init_extraction_worker.
+        self.extract_pool = self.new_extract_pool()
+        self.scoring_pool = ThreadPoolExecutor(max_workers = SCORING_THREADS, thread_name_prefix = "scoring")
+        self.slots = asyncio.Semaphore(MAX_CONCURRENCY)
+        print(f"✅ Service ready ({len(self.job_df)} jobs)")
+
+    @staticmethod
+    def new_extract_pool():
+        return ProcessPoolExecutor(
+            max_workers = EXTRACT_WORKERS, initializer = init_extraction_worker,
+            mp_context = multiprocessing.get_context("spawn")
+        )
+
+    def replace_extract_pool(self, broken):
+        """
+        Replaces the extraction pool after a worker died, which breaks the pool for
+        every later task. Requests that failed on the same pool replace it once.
+        """
+        if self.extract_pool is broken:
+            self.extract_pool = self.new_extract_pool()
+            broken.shutdown(wait = False)
+            print("❌ Extraction worker died; process pool restarted")
+
+    def close(self):
+        self.extract_pool.shutdown()
+        self.scoring_pool.shutdown()
+        self.write_queue.close()
+
+
+def extract_resume_bytes(data):
+    """
+    Extracts the student profile from the bytes of a resume PDF (runs in a worker
+    process). Returns the profile (None if nothing was extracted) and the worker's spans.
+    """
+    text = extract_pdf_text(data)
+    nlp_df = extract_profile(text)
+    return (records(nlp_df)[0] if not nlp_df.empty else None), worker_spans()
+
+
+def records(df):
+    # Round-trip through JSON so numpy scalars and NaN become plain JSON values
+    return json.loads(df.to_json(orient = "records"))
+
+
+def validate_options(algorithm, skill_scoring):
+    if algorithm not in ALGORITHMS:
+        raise HTTPException(status_code = 422, detail = f"Unknown algorithm: {algorithm}")
+    if skill_scoring not in ("mean", "coverage"):
+        raise HTTPException(status_code = 422, detail = f"Unknown skill scoring: {skill_scoring}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.service = ServiceState()
+    yield
+    app.state.service.close()
+
+
+app = FastAPI(title = "AI-Career Path Recommender", lifespan = lifespan)
+
+
+async def run_limited(pool, fn, *args):
+    """
+    Runs fn in the given pool once a concurrency slot is free; answers 503 if no
+    slot frees up within SERVICE_QUEUE_TIMEOUT seconds.
+    """
+    service = app.state.service
+    try:
+        await asyncio.wait_for(service.slots.acquire(), timeout = QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code = 503, detail = "Service busy, try again later")
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    finally:
+        service.slots.release()
+
+
+@app.get("/health")
+async def health():
+    service = app.state.service
+    return {"status": "ok", "jobs": len(service.job_df), "pending_writes": service.write_queue.pending()}
+
+
+@app.get("/metrics")
+async def metrics():
+    return get_metrics().summary()
+
+
+@app.post("/extract")
+async def extract(file: UploadFile = File(...)):
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code = 422, detail = "Please upload a PDF file.")
+    data = await file.read()
+    service = app.state.service
+    with get_metrics().span("http.extract"):
+        pool = service.extract_pool
+        try:
+            profile, spans = await run_limited(pool, extract_resume_bytes, data)
+        except (ValueError, TimeoutError) as e:
+            # Unreadable PDF, or one that took longer than PDF_TIMEOUT to parse
+            raise HTTPException(status_code = 422, detail = str(e))
+        except BrokenProcessPool:
+            service.replace_extract_pool(pool)
+            raise HTTPException(status_code = 503, detail = "Extraction worker died, try again")
+    for name, seconds, labels in spans:
+        get_metrics().record(name, seconds, **labels)
+    if profile is None:
+        raise HTTPException(status_code = 422, detail = "No student information could be extracted from the resume.")
+    return {"profile": profile}
+
+
+def recommend_one(request):
+    service = app.state.service
+    student_profile = pd.Series(request.profile.columns())
+    recommended_jobs, new_student = rank_jobs(
+        student_profile, service.job_df, request.top_k, request.algorithm, request.n_candidates,
+        request.skill_scoring, service.job_index, service.job_clusters
+    )
+    if request.save:
+        service.write_queue.put_students(pd.DataFrame([student_profile]))
+        service.write_queue.put_recommendation(new_student)
+    return records(recommended_jobs)
+
+
+def recommend_many(request):
+    service = app.state.service
+    students = pd.DataFrame([profile.columns() for profile in request.profiles])
+    recommendations = recommend_students(
+        students, service.job_df, request.top_k, request.algorithm, request.chunk_size,
+        request.n_candidates, request.skill_scoring, service.job_index, service.job_clusters
+    )
+    if request.save:
+        service.write_queue.put_students(students)
+        for name, top_jobs in zip(students["Name"], recommendations):
+            service.write_queue.put_recommendation(RecommendationProcessor.generate_recommendation_row(name, top_jobs))
+    return [records(top_jobs) for top_jobs in recommendations]
+
+
+@app.post("/recommend")
+async def recommend(request: RecommendRequest):
+    validate_options(request.algorithm, request.skill_scoring)
+    with get_metrics().span("http.recommend", algorithm = request.algorithm):
+        jobs = await run_limited(app.state.service.scoring_pool, recommend_one, request)
+    return {"recommendations": jobs}
+
+
+@app.post("/save")
+async def save(request: SaveRequest):
+    """
+    Queues a student and the recommendations already shown to them for the
+    database, without extracting or scoring again.
+    """
+    service = app.state.service
+    service.write_queue.put_students(pd.DataFrame([request.profile.columns()]))
+    top_jobs = pd.DataFrame({"Job Title": request.job_titles})
+    service.write_queue.put_recommendation(RecommendationProcessor.generate_recommendation_row(request.profile.name, top_jobs))
+    return {"status": "queued"}
+
+
+@app.post("/recommend/batch")
+async def recommend_batch(request: BatchRecommendRequest):
+    validate_options(request.algorithm, request.skill_scoring)
+    if not request.profiles:
+        return {"recommendations": []}
+    with get_metrics().span("http.recommend_batch", algorithm = request.algorithm, n_students = len(request.profiles)):
+        jobs = await run_limited(app.state.service.scoring_pool, recommend_many, request)
+    return {"recommendations": jobs}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    # One process: the models, indexes and pools are shared by every request
+    uvicorn.run(app, host = os.getenv("SERVICE_HOST", "0.0.0.0"), port = int(os.getenv("SERVICE_PORT", "8000")))
@@ -4,29 +4,107 @@ import pandas as pd
 import os
 import json
 import time
+import hashlib
 import argparse
 import base64
-from pdfminer.high_level import extract_text
 from StudentInfoExtractor import StudentInfoExtractor
-from RecommendationProcessor import RecommendationProcessor
-from databaseProcessor import databaseProcessor
+from RecommendationProcessor import RecommendationProcessor, DEFAULT_CANDIDATES
+from databaseProcessor import databaseProcessor, get_write_queue
 from ClusterProcessor import ClusterProcessor
-from main import main
+from ModelRegistry import ModelRegistry
+from JobCatalogue import load_job_data
+from JobEmbeddingIndex import JobEmbeddingIndex
+from JobClusterIndex import JobClusterIndex
+from main import extract_pdf_text, extract_profile, rank_jobs
+from ServiceClient import ServiceClient
+
+# When set, the app is a thin client of the recommendation service (service.py)
+API_URL = os.getenv("RECOMMENDER_API_URL")
 
 # Title
 st.set_page_config(page_title = "AI-Career Path Recommender", page_icon = "📚", layout = "wide")
 st.title("🎓 AI-Powered Career Path Recommendation System")
 
+# Load models and the job catalogue once per server process instead of on every rerun
+@st.cache_resource(show_spinner = "Loading models...")
+def warm_up_models():
+    ModelRegistry.warm_up()
+
+@st.cache_resource(show_spinner = "Loading job index...")
+def load_catalogue():
+    """
+    The job catalogue with its embedding index and cluster fit, shared by all sessions.
+    """
+    job_df = load_job_data("job_data.csv")
+    model = ModelRegistry.get_sentence_model()
+    job_index = JobEmbeddingIndex.for_catalogue(job_df, model, skill_cache = ModelRegistry.get_skill_cache())
+    return job_df, job_index, JobClusterIndex.load_or_build(job_index)
+
+@st.cache_resource
+def get_client():
+    return ServiceClient(API_URL)
+
+# Extraction results are cached per uploaded file (by content hash), so widget
+# changes re-use them instead of re-parsing the PDF
+@st.cache_data(show_spinner = False, max_entries = 100)
+def resume_text(file_hash, _data):
+    return extract_pdf_text(_data)
+
+@st.cache_data(show_spinner = "Extracting resume...", max_entries = 100)
+def student_profile(file_hash, _data, _text):
+    if API_URL:
+        return get_client().extract(_data)
+    nlp_df = extract_profile(_text)
+    return None if nlp_df.empty else nlp_df.iloc[-1].to_dict()
+
+# Only the ranking is recomputed when top k, the algorithm or its options change
+@st.cache_data(show_spinner = "🔍 Recommending jobs...", max_entries = 500)
+def ranked_jobs(file_hash, _profile, top_k, algorithm, n_candidates, skill_scoring):
+    if API_URL:
+        return get_client().recommend(_profile, top_k, algorithm, n_candidates, skill_scoring, save = False)
+    job_df, job_index, job_clusters = load_catalogue()
+    recommended_jobs, _ = rank_jobs(
+        pd.Series(_profile), job_df, top_k, algorithm, n_candidates, skill_scoring, job_index, job_clusters
+    )
+    return recommended_jobs
+
+def save_recommendation(profile, recommended_jobs):
+    """
+    Saves the student and the recommendation already shown to them to the database.
+    """
+    if API_URL:
+        get_client().save(profile, recommended_jobs)
+        return
+    write_queue = get_write_queue()
+    write_queue.put_students(pd.DataFrame([profile]))
+    write_queue.put_recommendation(RecommendationProcessor.generate_recommendation_row(profile["Name"], recommended_jobs))
+
+if not API_URL:
+    warm_up_models()
+    load_catalogue()
+
 # Sidebar
 st.sidebar.header("Configurations")
 algorithm = st.sidebar.selectbox(
     "Choose Preferred Recommendation Algorithm",
-    ("Semantic", "Clustering")
+    ("Semantic", "Clustering", "Two-Stage")
     )
 top_k = st.sidebar.slider(
     "Top k Job Recommendations",
     min_value = 1, max_value = 10, value = 5
 )
+n_candidates = st.sidebar.slider(
+    "Candidates Reranked (Two-Stage)",
+    min_value = 10, max_value = 200, value = DEFAULT_CANDIDATES, step = 10,
+    disabled = algorithm != "Two-Stage",
+    help = "More candidates are closer to Semantic ranking but slower"
+)
+skill_scoring = st.sidebar.selectbox(
+    "Skill Matching",
+    ("mean", "coverage"),
+    format_func = lambda mode: {"mean": "Whole skill list", "coverage": "Per required skill"}[mode],
+    disabled = algorithm == "Clustering"
+)
 
 # Uploading File
 uploaded_file = st.file_uploader("📄 Upload your resume (PDF)", type=["pdf"])
@@ -36,8 +114,13 @@ if uploaded_file is not None:
     resume_path = uploaded_file.name
     st.success("✅ PDF resume uploaded successfully!")
 
-    # Extract text directly from in-memory file object
-    text = extract_text(uploaded_file)
+    data = uploaded_file.getvalue()
+    file_hash = hashlib.sha256(data).hexdigest()
+    try:
+        text = resume_text(file_hash, data)
+    except (ValueError, TimeoutError) as e:
+        st.error(f"❌ {e}")
+        st.stop()
     show_resume = st.checkbox("My Resume")
     if show_resume:
         st.markdown("### 📄 Extracted Text")
@@ -49,18 +132,41 @@ if uploaded_file is not None:
         )
     col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
     with col3:
+        # After the first press, changing the sidebar re-ranks this resume straight away
         if st.button("🚀 Start Recommending Process"):
-            with st.spinner("🔍 Recommending jobs..."):
-                recommended_jobs = main(text, top_k = top_k, algorithm = algorithm)
-                time.sleep(1)  # Optional: simulate loading delay
+            st.session_state["recommending"] = file_hash
+            st.session_state.pop("saved", None)
+
+    if st.session_state.get("recommending") == file_hash:
+        try:
+            profile = student_profile(file_hash, data, text)
+            recommended_jobs = ranked_jobs(file_hash, profile, top_k, algorithm, n_candidates, skill_scoring) if profile else None
+        except Exception as e:
+            st.error(f"❌ Recommendation failed: {e}")
+            st.stop()
 
+        if recommended_jobs is None:
+            st.error("❌ No student information could be extracted from the resume.")
+        else:
+            if not st.session_state.get("saved"):
+                # Saved for the first ranking after the button press, not on every slider move
+                try:
+                    save_recommendation(profile, recommended_jobs)
+                    st.session_state["saved"] = True
+                except Exception as e:
+                    st.warning(f"⚠️ Recommendation could not be saved: {e}")
             st.success("✅ Job Recommendation Successful!")
 
-            if recommended_jobs is not None:
-                if algorithm == "Clustering":
-                    st.subheader("📌 Recommended Jobs")
-                    st.dataframe(recommended_jobs[["Job Title", "similarity"]].rename(columns={"similarity": "Score"}), hide_index=True)
-                elif algorithm == "Semantic":
-                    st.subheader("📌 Recommended Jobs")
-                    st.dataframe(recommended_jobs[["Job Title", "Total Score"]].rename(columns={"Total Score": "Score"}), hide_index=True)
-           
\ No newline at end of file
+            if algorithm == "Clustering":
+                st.subheader("📌 Recommended Jobs")
+                st.dataframe(recommended_jobs[["Job Title", "similarity"]].rename(columns={"similarity": "Score"}), hide_index=True)
+            elif algorithm in ("Semantic", "Two-Stage"):
+                st.subheader("📌 Recommended Jobs")
+                st.dataframe(recommended_jobs[["Job Title", "Total Score"]].rename(columns={"Total Score": "Score"}), hide_index=True)
+                if "Skill Matches" in recommended_jobs:
+                    for _, job in recommended_jobs.iterrows():
+                        with st.expander(f"🔎 Skill matches for {job['Job Title']}"):
+                            st.dataframe(
+                                pd.DataFrame(job["Skill Matches"], columns = ["Required Skill", "Your Skill", "Similarity"]),
+                                hide_index = True
+                            )